@@ -1,41 +1,318 @@
 import math
+import multiprocessing
+import os
 import random
+import threading
 import time
 from fenix import FenixAction
-from agent import Agent
+from evaluation import DEFAULT_WEIGHTS, DEFAULT_WEIGHTS_PATH, evaluate_boards, load_weights
+from move_ordering import MoveOrdering
+from opening_book import OpeningBook
+from tablebase import DRAW, WIN, Tablebase
+from transposition import EXACT, LOWER, UPPER, TranspositionTable, position_key
+
+
+class Agent:
+    def __init__(self, player):
+        """Agent de base : joue pour le joueur donné (1 ou -1)."""
+        self.player = player
+
+    def act(self, state, remaining_time):
+        """Renvoie l'action à jouer dans l'état donné, compte tenu du temps restant."""
+        raise NotImplementedError
+
+    def ponder(self, state):
+        """
+        Appelé par le gestionnaire de partie juste après le coup de l'agent, avec l'état où l'adversaire a le trait :
+        l'agent peut chercher en arrière-plan pendant le temps de l'adversaire. Par défaut, il ne fait rien.
+        """
+
+    def stop_pondering(self):
+        """
+        Appelé par le gestionnaire dès que l'adversaire a joué, avant `act` : arrête la recherche en arrière-plan.
+        Le temps passé ici est décompté du temps de l'agent.
+        """
+
+    def allocate_time(self, state, remaining_time):
+        """
+        Temps alloué au coup : le temps restant est réparti sur le nombre de coups qu'il nous reste
+        probablement à jouer (une partie dure rarement plus de 100 tours), sans jamais dépasser un quart de la pendule.
+        """
+        moves_to_go = max(10, (100 - state.turn) // 2)
+        return max(0.01, min(remaining_time / moves_to_go, remaining_time * 0.25))
+
+
+class SearchTimeout(Exception):
+    """Levée dans la recherche quand le temps alloué au coup est écoulé."""
+
+
+def _ponder_process(agent, state, connection, stop):
+    # Processus de réflexion : approfondissement itératif sur l'état, (clé, profondeur, variation, valeur) envoyé
+    # après chaque itération terminée, jusqu'à ce que `stop` soit levé.
+    if hasattr(os, 'nice'):
+        os.nice(19)
+    agent.time_limit = math.inf
+
+    def watch():
+        # La recherche s'interrompt au prochain nœud, comme à la fin du temps alloué.
+        stop.wait()
+        agent.time_limit = -math.inf
+
+    threading.Thread(target=watch, daemon=True).start()
+    if agent.tt is not None:
+        agent.tt.new_search()
+    if agent.ordering is not None:
+        agent.ordering.new_search()
+    key = position_key(state)
+    pv = ()
+    value = None
+    try:
+        for depth in range(1, (agent.depth or agent.MAX_DEPTH) + 1):
+            value, _ = agent.aspiration_search(state, depth, pv, value)
+            pv = agent.pv
+            connection.send((key, depth, pv, value))
+    except SearchTimeout:
+        pass
+    connection.close()
 
 
 class BaseAgent(Agent):
-    def __init__(self, player, search_depth=3):
-        """Agent utilisant l'algorithme alpha-bêta, avec une profondeur de recherche donnée."""
+    MAX_DEPTH = 64
+    """Profondeur maximale de l'approfondissement itératif quand `search_depth` n'est pas donné."""
+    TABLEBASE_SCORE = 1000
+    """Valeur d'une position gagnée selon les tables de finales, diminuée du nombre de demi-coups avant le gain."""
+    WIN_THRESHOLD = TABLEBASE_SCORE // 2
+    """Valeur absolue à partir de laquelle un score est celui d'un gain ou d'une perte, et non une évaluation."""
+    ASPIRATION_WINDOW = 1.0
+    """Demi-largeur de la fenêtre d'aspiration initiale du moteur 'pvs', multipliée par 4 à chaque échec."""
+    DELTA_MARGIN = 2.0
+    """Marge de l'élagage delta de la recherche de quiescence."""
+    NULL_MOVE_REDUCTION = 2
+    """Réduction de profondeur de la recherche après un coup nul (en plus du demi-coup passé)."""
+    NULL_MOVE_MIN_PIECES = 3
+    """Nombre minimal de soldats et généraux du joueur au trait pour essayer un coup nul (sinon, risque de zugzwang)."""
+    LMR_MIN_INDEX = 3
+    """Rang à partir duquel un coup tranquille est cherché avec une profondeur réduite."""
+
+    def __init__(self, player, search_depth=None, tt_size_mb=16, evaluator='python', opening_book=None,
+                 tablebase=None, move_ordering='history', engine='pvs', quiescence_budget=64, null_move=False,
+                 late_move_reductions=False, weights=None):
+        """
+        Agent utilisant l'algorithme alpha-bêta avec approfondissement itératif.
+        `search_depth` borne la profondeur des itérations (None : seul le temps l'arrête).
+        La table de transposition occupe au plus `tt_size_mb` Mo (0 pour la désactiver) et est conservée d'un tour à l'autre.
+        `evaluator` vaut 'python' (evaluate, feuille par feuille) ou 'numpy' (evaluation.evaluate_boards, par lots).
+        `opening_book` et `tablebase` sont un livre d'ouvertures et des tables de finales, ou leurs chemins.
+        `move_ordering` vaut 'history' (voir MoveOrdering) ou 'heuristique' ; `engine` vaut 'pvs' ou 'minimax'.
+        `quiescence_budget` borne les nœuds de la recherche de quiescence à chaque feuille (0 pour la désactiver).
+        `null_move` et `late_move_reductions` activent la recherche sélective du moteur 'pvs'.
+        `weights` est le vecteur de poids de l'évaluation (voir evaluation.WEIGHT_NAMES) ou le chemin d'un fichier.
+        """
         super().__init__(player)
+        if evaluator not in ('python', 'numpy'):
+            raise ValueError(f"Unknown evaluator: {evaluator}")
+        if move_ordering not in ('history', 'heuristique'):
+            raise ValueError(f"Unknown move ordering: {move_ordering}")
+        if engine not in ('minimax', 'pvs'):
+            raise ValueError(f"Unknown engine: {engine}")
         self.depth = search_depth
+        self.evaluator = evaluator
+        self.engine = engine
+        self.quiescence_budget = quiescence_budget
+        # Désactivés par défaut : ils font chercher plus profond mais n'ont pas encore gagné de force en parties
+        # contre le moteur sans eux.
+        self.null_move = null_move
+        self.late_move_reductions = late_move_reductions
+        # Par défaut, les poids ajustés par texel.py s'ils existent, sinon les poids d'origine.
+        if weights is None:
+            weights = DEFAULT_WEIGHTS_PATH if os.path.exists(DEFAULT_WEIGHTS_PATH) else DEFAULT_WEIGHTS
+        self.set_weights(load_weights(weights) if isinstance(weights, str) else weights)
         self.time_limit = None
+        self.tt = TranspositionTable(tt_size_mb) if tt_size_mb else None
+        self.pv = ()
+        self.last_depth = 0
+        self.last_value = None
+        self.opening_book = OpeningBook.load(opening_book) if isinstance(opening_book, str) else opening_book
+        self.tablebase = Tablebase(tablebase) if isinstance(tablebase, str) else tablebase
+        self.predicted_reply = None
+        self.ponder_process = None
+        self.ponder_result = None
+        self.ordering = MoveOrdering(self.MAX_DEPTH) if move_ordering == 'history' else None
+        self.reset_stats()
+
+    def set_weights(self, weights):
+        """Change le vecteur de poids de `evaluate` et `heuristique` (dans l'ordre de evaluation.WEIGHT_NAMES)."""
+        self.weights = [float(weight) for weight in weights]
+        (soldier, general, king, self.center_weight, self.protection_weight, self.cohesion_weight,
+         self.missing_king_weight, capture_soldier, capture_general, capture_king, self.target_center_weight) = self.weights
+        self.piece_values = {1: soldier, 2: general, 3: king}
+        self.capture_values = {1: capture_soldier, 2: capture_general, 3: capture_king}
+        # Gain maximal de `evaluate` quand une pièce est prise : sa valeur et son plus grand bonus de centre.
+        self.capture_gains = {value: abs(piece) + 3 * abs(self.center_weight)
+                              for value, piece in self.piece_values.items()}
+
+    def reset_stats(self):
+        """
+        Remet à zéro les compteurs de la recherche : `nodes` (nœuds visités), `qnodes` (nœuds de la recherche de
+        quiescence, comptés aussi dans `nodes`), `cutoffs` (coupures alpha-bêta) et `first_move_cutoffs` (coupures
+        dès le premier coup essayé, signe d'un bon ordre des coups).
+        """
+        self.nodes = 0
+        self.qnodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def book_move(self, state, moves):
+        """Renvoie le coup du livre d'ouvertures pour cet état s'il est légal, sinon None."""
+        if self.opening_book is None:
+            return None
+        move = self.opening_book.lookup(state)
+        return move if move in moves else None
+
+    def terminal_value(self, state, ply=0):
+        """
+        Valeur d'un état terminal du point de vue de l'agent, à `ply` demi-coups de la racine : TABLEBASE_SCORE
+        diminué de la distance pour un gain (gagner vite, perdre tard), 0 pour une nulle.
+        """
+        return float(state.utility(self.player) * (self.TABLEBASE_SCORE - ply))
+
+    def tablebase_value(self, state, ply=0):
+        """
+        Valeur de l'état selon les tables de finales, du point de vue de l'agent et sur la même échelle que
+        `terminal_value`, ou None s'il n'est pas couvert.
+        """
+        if self.tablebase is None:
+            return None
+        result = self.tablebase.probe_game(state)
+        if result is None:
+            return None
+        wdl, dtm = result
+        if wdl == DRAW:
+            return 0.0
+        value = self.TABLEBASE_SCORE - ply - dtm if wdl == WIN else ply + dtm - self.TABLEBASE_SCORE
+        return float(value if state.current_player == self.player else -value)
+
+    def tablebase_move(self, state, moves):
+        """
+        Renvoie le meilleur coup selon les tables de finales si l'état et tous ses enfants sont couverts, sinon None.
+        """
+        if self.tablebase_value(state) is None:
+            return None
+        best_move, best_value = None, -math.inf
+        for move in moves:
+            state.apply(move)
+            if state.is_terminal():
+                value = self.terminal_value(state, 1)
+            else:
+                value = self.tablebase_value(state, 1)
+            state.undo()
+            if value is None:
+                return None
+            if value > best_value:
+                best_move, best_value = move, value
+        return best_move
 
     def act(self, state, remaining_time):
         """Décide du meilleur coup à jouer en fonction du temps restant et de l'état actuel."""
         start_time = time.perf_counter()
+        self.stop_pondering()
+        self.predicted_reply = None
+        self.last_value = None
         moves = state.actions()
 
         if not moves:
             return None
+        if len(moves) == 1:
+            return moves[0]
+        book_move = self.book_move(state, moves) or self.tablebase_move(state, moves)
+        if book_move is not None:
+            return book_move
 
-        if remaining_time < 1 or len(moves) > 25:
-            self.depth = 1
-        elif remaining_time < 3 or len(moves) > 15:
-            self.depth = 2
-        else:
-            self.depth = 3
+        budget = self.allocate_time(state, remaining_time)
+        self.time_limit = start_time + budget
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.ordering is not None:
+            self.ordering.new_search()
 
-        self.time_limit = start_time + min(1.2, remaining_time * 0.9)
-
-        none, chosen_move = self.alpha_beta(state)
+        chosen_move = None
+        root = len(state.undo_stack)
+        self.pv = ()
+        self.last_depth = 0
+        depth = 1
+        value = None
+        # L'adversaire a joué le coup deviné : on reprend la recherche faite pendant son temps là où elle s'est arrêtée.
+        if self.ponder_result is not None and self.ponder_result[0] == position_key(state):
+            _, ponder_depth, ponder_pv, ponder_value = self.ponder_result
+            if ponder_pv and ponder_pv[0] in moves:
+                self.pv, chosen_move, self.last_depth, value = ponder_pv, ponder_pv[0], ponder_depth, ponder_value
+                depth = ponder_depth + 1
+        self.ponder_result = None
+        while depth <= (self.depth or self.MAX_DEPTH):
+            try:
+                value, chosen_move = self.aspiration_search(state, depth, self.pv, value)
+            except SearchTimeout:
+                # La recherche interrompue laisse l'état modifié : on le remet à la racine.
+                while len(state.undo_stack) > root:
+                    state.undo()
+                break
+            self.last_depth = depth
+            # Une itération coûte plusieurs fois la précédente : inutile d'en lancer une qu'on ne finira pas.
+            if time.perf_counter() - start_time > budget / 2:
+                break
+            depth += 1
+        # Valeur de la dernière itération terminée, du point de vue de l'agent (None sans recherche).
+        self.last_value = value
 
         if chosen_move in moves:
+            if len(self.pv) > 1 and self.pv[0] == chosen_move:
+                self.predicted_reply = self.pv[1]
             return chosen_move
 
         return random.choice(moves)
-    
+
+    def ponder(self, state):
+        """
+        Devine la réponse de l'adversaire (la suite de la variation principale, sinon le coup qu'il préfère selon
+        l'heuristique) et cherche la position qui en résulte dans un processus séparé, jusqu'à `stop_pondering`. Si
+        l'adversaire joue ce coup, `act` repart de la profondeur atteinte. Le processus a la priorité la plus basse :
+        il n'utilise que le temps de processeur que la recherche de l'adversaire laisse libre.
+        """
+        self.stop_pondering()
+        if state.is_terminal():
+            return
+        moves = state.actions()
+        if not moves:
+            return
+        if self.predicted_reply in moves:
+            reply = self.predicted_reply
+        else:
+            reply = max(moves, key=lambda move: self.heuristique(move, state))
+        state.apply(reply)
+        if state.is_terminal():
+            return
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        stop = multiprocessing.Event()
+        process = multiprocessing.Process(target=_ponder_process, args=(self, state, sender, stop), daemon=True)
+        process.start()
+        sender.close()
+        self.ponder_process = (process, receiver, stop)
+
+    def stop_pondering(self):
+        """Arrête la recherche en arrière-plan et garde le résultat de sa dernière itération terminée."""
+        if self.ponder_process is not None:
+            process, receiver, stop = self.ponder_process
+            stop.set()
+            # Le processus ferme son bout du tube en se terminant.
+            try:
+                while True:
+                    self.ponder_result = receiver.recv()
+            except EOFError:
+                pass
+            process.join()
+            receiver.close()
+            self.ponder_process = None
+
     def heuristique(self, move, state):
         """
         Évalue rapidement un coup : favorise les captures importantes et les bonnes positions.
@@ -43,58 +320,359 @@ class BaseAgent(Agent):
         roi > general > soldat 
         """
         points = 0
-        piece_vals = {1: 2, 2: 5, 3: 10}
 
         for pos in move.removed:
             p = state.pieces.get(pos)
             if p:
-                points += piece_vals.get(abs(p), 0)
+                points += self.capture_values.get(abs(p), 0)
 
         r, c = move.end
         mid_r, mid_c = state.dim[0] // 2, state.dim[1] // 2
         dist = abs(r - mid_r) + abs(c - mid_c)
-        points += max(0, 5 - dist)
+        points += self.target_center_weight * max(0, 5 - dist)
 
         return points
 
-    def alpha_beta(self, state):
-        """Recherche du meilleur coup via l'algorithme alpha-bêta."""
+    def aspiration_search(self, state, depth, pv=(), guess=None):
+        """
+        Itération de l'approfondissement itératif. Avec le moteur 'pvs' et la valeur `guess` de l'itération
+        précédente, la racine est d'abord cherchée dans une fenêtre étroite autour de `guess`, élargie du côté de
+        l'échec tant que la valeur en sort ; sinon, avec la fenêtre complète. Renvoie la valeur et le meilleur coup.
+        """
+        if self.engine != 'pvs' or guess is None or not math.isfinite(guess):
+            return self.alpha_beta(state, depth, pv)
+        low = high = self.ASPIRATION_WINDOW
+        while True:
+            alpha, beta = guess - low, guess + high
+            value, move = self.alpha_beta(state, depth, pv, alpha=alpha, beta=beta)
+            if value <= alpha:
+                low *= 4
+            elif value >= beta:
+                high *= 4
+            else:
+                return value, move
+            # Au-delà de l'écart entre deux positions gagnées, la fenêtre étroite ne sert plus.
+            if low > self.TABLEBASE_SCORE or high > self.TABLEBASE_SCORE:
+                return self.alpha_beta(state, depth, self.pv)
+            pv = self.pv
+
+    def alpha_beta(self, state, depth, pv=(), alpha=-math.inf, beta=math.inf, root_moves=None):
+        """
+        Recherche alpha-bêta à profondeur fixe dans la fenêtre (`alpha`, `beta`) : hors de la fenêtre, la valeur
+        renvoyée n'est qu'une borne. Les coups de la variation principale `pv` sont essayés en premier et
+        `root_moves` restreint les coups de la racine (recherche parallèle). Renvoie la valeur et le meilleur coup,
+        garde la nouvelle variation principale dans `self.pv` et lève SearchTimeout si le temps est dépassé.
+        """
+
+        def probe(s, a, b, d, ply):
+            # Renvoie (valeur, coup) si la table suffit à conclure, sinon (None, coup à essayer en premier).
+            if self.tt is None:
+                return None, None
+            entry = self.tt.probe(position_key(s))
+            if entry is None:
+                return None, None
+            value = from_table(entry.value, ply)
+            if entry.depth >= d and (entry.bound == EXACT or
+                                     (entry.bound == LOWER and value >= b) or
+                                     (entry.bound == UPPER and value <= a)):
+                self.tt.cutoffs += 1
+                return value, entry.move
+            return None, entry.move
+
+        # Un gain ou une perte dépend de la distance à la racine : la table garde la distance au nœud, pour que la
+        # valeur reste juste quand la position est retrouvée à un autre demi-coup.
+        def to_table(value, ply):
+            if value >= self.WIN_THRESHOLD:
+                return value + ply
+            if value <= -self.WIN_THRESHOLD:
+                return value - ply
+            return value
+
+        def from_table(value, ply):
+            if value >= self.WIN_THRESHOLD:
+                return value - ply
+            if value <= -self.WIN_THRESHOLD:
+                return value + ply
+            return value
+
+        ordering = self.ordering
+
+        def ordered_actions(s, first_moves, ply):
+            if ordering is None:
+                return s.iter_actions(first_moves, key=lambda x: self.heuristique(x, s))
+            return s.iter_actions(first_moves + tuple(ordering.hints(ply)), key=ordering.key(s))
+
+        def cutoff(move, d, ply, index):
+            self.cutoffs += 1
+            if index == 0:
+                self.first_move_cutoffs += 1
+            if ordering is not None:
+                ordering.cutoff(move, ply, d)
+
+        def store(s, a, b, d, ply, best_val, best_move):
+            if self.tt is None:
+                return
+            bound = UPPER if best_val <= a else LOWER if best_val >= b else EXACT
+            self.tt.store(position_key(s), d, to_table(best_val, ply), bound, best_move)
+
+        def frontier(s, maximize, ply):
+            # Dernier niveau de la recherche : les enfants sont tous évalués en un seul lot, sans coupure. Comme dans
+            # max_value/min_value, une répétition vaut 0, puis les tables de finales et les états terminaux priment.
+            moves = list(s.iter_actions())
+            if not moves:
+                return (-math.inf if maximize else math.inf), ()
+            self.nodes += len(moves)
+            boards = []
+            repeated = []
+            known = dict()
+            for index, move in enumerate(moves):
+                s.apply(move)
+                boards.append(s._flatten())
+                repeated.append(s._repetitions() > 0)
+                if not repeated[-1]:
+                    value = self.tablebase_value(s, ply + 1)
+                    if value is None and s.is_terminal():
+                        value = self.terminal_value(s, ply + 1)
+                    if value is not None:
+                        known[index] = value
+                s.undo()
+            scores = evaluate_boards(boards, self.player, self.weights)
+            scores[repeated] = 0.0
+            for index, value in known.items():
+                scores[index] = value
+            best = int(scores.argmax() if maximize else scores.argmin())
+            best_val = float(scores[best])
+            store(s, -math.inf, math.inf, 1, ply, best_val, moves[best])
+            return best_val, (moves[best],)
+
+        def max_value(s, a, b, d, ply, pv):
+            # `ply` : demi-coups joués depuis la racine, coups nuls compris (d peut baisser plus vite).
+            if time.perf_counter() > self.time_limit:
+                raise SearchTimeout()
+            self.nodes += 1
+            # Position déjà rencontrée depuis la dernière prise : nulle, la répéter ne fait pas progresser la partie.
+            if ply and s._repetitions():
+                return 0.0, ()
+            # Position couverte par les tables de finales : leur valeur, sans recherche.
+            tb_val = self.tablebase_value(s, ply) if ply else None
+            if tb_val is not None:
+                return tb_val, ()
+            if s.is_terminal():
+                return self.terminal_value(s, ply), ()
+            if d == 0:
+                return leaf(s, a, b, ply), ()
 
-        def max_value(s, a, b, d):
-            if time.perf_counter() > self.time_limit or d == 0 or s.is_terminal():
-                return self.evaluate(s), None
+            # Racine restreinte à certains coups : sa valeur ne vaut que pour ces coups et ne va pas dans la table.
+            restricted = ply == 0 and root_moves is not None
+            tt_val, tt_move = probe(s, a, b, d, ply) if not restricted else (None, None)
+            if tt_val is not None:
+                return tt_val, (tt_move,) if tt_move is not None else ()
+            if d == 1 and batch_leaves and not restricted:
+                return frontier(s, True, ply)
 
-            best_val, best_move = -math.inf, None
-            options = sorted(s.actions(), key=lambda x: self.heuristique(x, s), reverse=True)
+            a_orig = a
+            best_val, best_pv = -math.inf, ()
+            if restricted:
+                options = root_moves
+            else:
+                options = ordered_actions(s, (pv[0] if pv else None, tt_move), ply)
 
-            for move in options:
-                val, _ = min_value(s.result(move), a, b, d - 1)
+            for index, move in enumerate(options):
+                s.apply(move)
+                val, child_pv = min_value(s, a, b, d - 1, ply + 1, pv[1:] if pv and move == pv[0] else ())
+                s.undo()
                 if val > best_val:
-                    best_val, best_move = val, move
+                    best_val, best_pv = val, (move,) + child_pv
                     a = max(a, val)
                 if best_val >= b:
+                    cutoff(move, d, ply, index)
                     break
 
-            return best_val, best_move
+            if not restricted:
+                store(s, a_orig, b, d, ply, best_val, best_pv[0] if best_pv else None)
+            return best_val, best_pv
+
+        def min_value(s, a, b, d, ply, pv):
+            if time.perf_counter() > self.time_limit:
+                raise SearchTimeout()
+            self.nodes += 1
+            if s._repetitions():
+                return 0.0, ()
+            tb_val = self.tablebase_value(s, ply)
+            if tb_val is not None:
+                return tb_val, ()
+            if s.is_terminal():
+                return self.terminal_value(s, ply), ()
+            if d == 0:
+                return leaf(s, a, b, ply), ()
 
-        def min_value(s, a, b, d):
-            if time.perf_counter() > self.time_limit or d == 0 or s.is_terminal():
-                return self.evaluate(s), None
+            tt_val, tt_move = probe(s, a, b, d, ply)
+            if tt_val is not None:
+                return tt_val, (tt_move,) if tt_move is not None else ()
+            if d == 1 and batch_leaves:
+                return frontier(s, False, ply)
 
-            best_val, best_move = math.inf, None
-            options = sorted(s.actions(), key=lambda x: self.heuristique(x, s), reverse=True)
+            b_orig = b
+            best_val, best_pv = math.inf, ()
+            options = ordered_actions(s, (pv[0] if pv else None, tt_move), ply)
 
-            for move in options:
-                val, _ = max_value(s.result(move), a, b, d - 1)
+            for index, move in enumerate(options):
+                s.apply(move)
+                val, child_pv = max_value(s, a, b, d - 1, ply + 1, pv[1:] if pv and move == pv[0] else ())
+                s.undo()
                 if val < best_val:
-                    best_val, best_move = val, move
+                    best_val, best_pv = val, (move,) + child_pv
                     b = min(b, val)
                 if best_val <= a:
+                    cutoff(move, d, ply, index)
+                    break
+
+            store(s, a, b_orig, d, ply, best_val, best_pv[0] if best_pv else None)
+            return best_val, best_pv
+
+        def quiescence(s, a, b, budget, ply):
+            # Negamax sur les seules prises, du point de vue du joueur au trait ; budget[0] : nœuds encore permis.
+            # Les prises étant obligatoires, seule une position sans prise est évaluée telle quelle (« stand-pat ») ;
+            # ailleurs, l'évaluation statique ne sert qu'à l'élagage delta des prises qui ne relèvent pas alpha.
+            if time.perf_counter() > self.time_limit:
+                raise SearchTimeout()
+            self.nodes += 1
+            self.qnodes += 1
+            sign = 1 if s.current_player == self.player else -1
+            if s.is_terminal():
+                return sign * self.terminal_value(s, ply)
+            stand_pat = sign * self.evaluate(s)
+            if budget[0] <= 0 or s.turn < 10 or not s._has_capture():
+                return stand_pat
+            budget[0] -= 1
+            pieces = s.pieces
+            key = ordering.key(s) if ordering is not None else None
+            best_val = -math.inf
+            for move in s.iter_actions(key=key):
+                # Gain maximal de la prise : valeur et bonus de centre des pièces prises (prendre un roi n'est
+                # jamais élagué).
+                victims = [abs(pieces[position]) for position in move.removed]
+                if 3 not in victims:
+                    optimistic = stand_pat + sum(self.capture_gains[victim] for victim in victims) + self.DELTA_MARGIN
+                    if optimistic <= a:
+                        best_val = max(best_val, optimistic)
+                        continue
+                s.apply(move)
+                val = -quiescence(s, -b, -a, budget, ply + 1)
+                s.undo()
+                if val > best_val:
+                    best_val = val
+                    a = max(a, val)
+                if best_val >= b:
+                    break
+            return best_val
+
+        def leaf(s, a, b, ply):
+            # Valeur d'une feuille du point de vue de l'agent, dans la fenêtre (a, b) de l'agent.
+            if not self.quiescence_budget:
+                return self.evaluate(s)
+            if s.current_player == self.player:
+                return quiescence(s, a, b, [self.quiescence_budget], ply)
+            return -quiescence(s, -b, -a, [self.quiescence_budget], ply)
+
+        # Avec l'évaluateur 'numpy', le dernier niveau n'est évalué par lots que sans quiescence.
+        batch_leaves = self.evaluator == 'numpy' and not self.quiescence_budget
+
+        def null_move_allowed(s, b, d, sign):
+            # Coup nul si l'évaluation statique dépasse déjà beta ; jamais pendant le placement, quand une prise est
+            # obligatoire ni avec peu de pièces (risque de zugzwang).
+            if not self.null_move or d < self.NULL_MOVE_REDUCTION + 2 or s.turn < 10:
+                return False
+            player = s.current_player
+            if s.piece_counts[player] + s.piece_counts[2 * player] < self.NULL_MOVE_MIN_PIECES:
+                return False
+            return not s._has_capture() and sign * self.evaluate(s) >= b
+
+        # Moteur 'pvs' : negamax, valeurs du point de vue du joueur au trait (celles de la table restent du point de
+        # vue de l'agent). Le premier coup de chaque nœud est cherché avec la fenêtre complète, les suivants avec une
+        # fenêtre nulle, puis de nouveau avec la fenêtre complète s'ils la dépassent.
+        def negamax(s, a, b, d, ply, pv, null_ok=True):
+            if time.perf_counter() > self.time_limit:
+                raise SearchTimeout()
+            self.nodes += 1
+            sign = 1 if s.current_player == self.player else -1
+            if ply and s._repetitions():
+                return 0.0, ()
+            tb_val = self.tablebase_value(s, ply) if ply else None
+            if tb_val is not None:
+                return sign * tb_val, ()
+            if s.is_terminal():
+                return sign * self.terminal_value(s, ply), ()
+            if d == 0:
+                return sign * leaf(s, *((a, b) if sign == 1 else (-b, -a)), ply), ()
+
+            # Fenêtre du point de vue de l'agent, pour la table de transposition.
+            window = (a, b) if sign == 1 else (-b, -a)
+            restricted = ply == 0 and root_moves is not None
+            tt_val, tt_move = probe(s, *window, d, ply) if not restricted else (None, None)
+            if tt_val is not None:
+                return sign * tt_val, (tt_move,) if tt_move is not None else ()
+            if d == 1 and batch_leaves and not restricted:
+                val, best_pv = frontier(s, sign == 1, ply)
+                return sign * val, best_pv
+
+            # Fenêtre nulle (nœud hors variation principale) : le joueur au trait passe son tour et la position est
+            # cherchée moins profondément ; si l'adversaire ne ramène pas la valeur sous beta, le nœud est coupé.
+            # Jamais deux coups nuls de suite.
+            scout = b == math.nextafter(a, math.inf)
+            if null_ok and scout and ply and null_move_allowed(s, b, d, sign):
+                s.apply_null_move()
+                val, _ = negamax(s, -b, -a, d - 1 - self.NULL_MOVE_REDUCTION, ply + 1, (), False)
+                s.undo()
+                if -val >= b:
+                    return b, ()
+
+            best_val, best_pv = -math.inf, ()
+            if restricted:
+                options = root_moves
+            else:
+                options = ordered_actions(s, (pv[0] if pv else None, tt_move), ply)
+            # Réduction des coups tardifs : à partir du rang LMR_MIN_INDEX, un coup tranquille (ni prise, ni
+            # empilement) est d'abord cherché moins profond, puis à pleine profondeur s'il dépasse alpha. Seulement
+            # hors variation principale, jamais à la racine.
+            reduce = (self.late_move_reductions and scout and ply and d >= 3 and s.turn >= 10 and
+                      not s._has_capture())
+
+            for index, move in enumerate(options):
+                child_pv = pv[1:] if pv and move == pv[0] else ()
+                reduction = 0
+                if reduce and index >= self.LMR_MIN_INDEX and move.end not in s.pieces:
+                    reduction = 1 if index < 8 else 2
+                s.apply(move)
+                if index == 0 or a == -math.inf:
+                    val, line = negamax(s, -b, -a, d - 1, ply + 1, child_pv)
+                    val = -val
+                else:
+                    val, line = negamax(s, -math.nextafter(a, math.inf), -a, d - 1 - reduction, ply + 1, child_pv)
+                    val = -val
+                    if reduction and val > a:
+                        val, line = negamax(s, -math.nextafter(a, math.inf), -a, d - 1, ply + 1, child_pv)
+                        val = -val
+                    if a < val < b:
+                        val, line = negamax(s, -b, -a, d - 1, ply + 1, child_pv)
+                        val = -val
+                s.undo()
+                if val > best_val:
+                    best_val, best_pv = val, (move,) + line
+                    a = max(a, val)
+                if best_val >= b:
+                    cutoff(move, d, ply, index)
                     break
 
-            return best_val, best_move
+            if not restricted:
+                store(s, *window, d, ply, sign * best_val, best_pv[0] if best_pv else None)
+            return best_val, best_pv
 
-        return max_value(state, -math.inf, math.inf, self.depth)
+        if self.engine == 'pvs':
+            value, self.pv = negamax(state, alpha, beta, depth, 0, pv)
+        else:
+            value, self.pv = max_value(state, alpha, beta, depth, 0, pv)
+        return value, self.pv[0] if self.pv else None
 
     def evaluate(self, state):
         """
@@ -110,11 +688,11 @@ class BaseAgent(Agent):
 
         for position, piece in state.pieces.items():
             abs_val = abs(piece)
-            val = {1: 1, 2: 3, 3: 5}.get(abs_val, 0) # soldat, general, roi 
+            val = self.piece_values.get(abs_val, 0) # soldat, general, roi 
 
             r, c = position
             center_dist = abs(r - state.dim[0] // 2) + abs(c - state.dim[1] // 2)
-            val += max(0, 3 - center_dist)
+            val += self.center_weight * max(0, 3 - center_dist)
 
             if piece * self.player > 0:
                 score += val
@@ -126,7 +704,7 @@ class BaseAgent(Agent):
 
         if king:
             around = [(king[0] + dx, king[1] + dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1] if (dx, dy) != (0, 0)]
-            protection = sum(0.5 for pos in around if pos in state.pieces and state.pieces[pos] * self.player > 0)
+            protection = sum(self.protection_weight for pos in around if pos in state.pieces and state.pieces[pos] * self.player > 0)
             score += protection
 
         close_bonus = 0
@@ -134,11 +712,10 @@ class BaseAgent(Agent):
             for j in range(i + 1, len(allies)):
                 dist = abs(allies[i][0] - allies[j][0]) + abs(allies[i][1] - allies[j][1])
                 if dist <= 2:
-                    close_bonus += 0.3
+                    close_bonus += self.cohesion_weight
         score += close_bonus
 
         if not state._has_king(-self.player):
-            score += 50
+            score += self.missing_king_weight
 
-        print("Evaluation : ", score)
         return score
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+
+ROWS, COLS = 7, 8
+
+EVALUATION_WEIGHTS = ('soldier', 'general', 'king', 'center', 'king_protection', 'cohesion', 'missing_king')
+"""
+Poids de l'évaluation : valeur de chaque pièce, bonus de centralisation (multiplié par max(0, 3 - distance au
+centre)), protection du roi (par allié voisin), cohésion (par paire d'alliés à distance au plus 2) et bonus si
+l'adversaire n'a plus de roi.
+"""
+ORDERING_WEIGHTS = ('capture_soldier', 'capture_general', 'capture_king', 'target_center')
+"""Poids de `BaseAgent.heuristique` : valeur de chaque pièce prise et bonus de l'arrivée près du centre."""
+WEIGHT_NAMES = EVALUATION_WEIGHTS + ORDERING_WEIGHTS
+"""Ordre des poids dans un vecteur de poids (et dans un fichier de poids)."""
+
+DEFAULT_WEIGHTS = np.array([1, 3, 5, 1, 0.5, 0.3, 50, 2, 5, 10, 1], dtype=np.float64)
+"""Poids choisis à la main, utilisés sans fichier de poids."""
+
+DEFAULT_WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weights.npy')
+"""Fichier de poids chargé par défaut par BaseAgent s'il existe (écrit par texel.py)."""
+
+CENTER_BONUS = np.array([max(0, 3 - abs(i - ROWS // 2) - abs(j - COLS // 2)) for i in range(ROWS) for j in range(COLS)],
+                        dtype=np.float64)
+"""Bonus de centralisation de chaque case, indexée par ligne * 8 + colonne."""
+
+KING_NEIGHBORHOOD = np.array([[1.0 if max(abs(i - k), abs(j - l)) == 1 else 0.0
+                               for k in range(ROWS) for l in range(COLS)]
+                              for i in range(ROWS) for j in range(COLS)])
+"""KING_NEIGHBORHOOD[a, b] vaut 1 si les cases a et b sont voisines (huit directions)."""
+
+COHESION_OFFSETS = [(di, dj) for di in range(-2, 3) for dj in range(-2, 3) if 0 < abs(di) + abs(dj) <= 2]
+"""Décalages du noyau de cohésion : les cases à distance de Manhattan 1 ou 2."""
+
+
+def board_array(states):
+    """Empile les plateaux des états dans un tableau (N, 56) de valeurs de pièces."""
+    return np.array([state._flatten() for state in states], dtype=np.int8).reshape(-1, ROWS * COLS)
+
+
+def _cohesion_pairs(allies):
+    # Convolution du masque des alliés par le noyau en losange : nombre d'alliés proches de chaque case.
+    grid = allies.reshape(-1, ROWS, COLS)
+    padded = np.pad(grid, ((0, 0), (2, 2), (2, 2)))
+    close = np.zeros_like(grid)
+    for di, dj in COHESION_OFFSETS:
+        close += padded[:, 2 + di:2 + di + ROWS, 2 + dj:2 + dj + COLS]
+    # Chaque paire est comptée depuis ses deux extrémités.
+    return (close * grid).sum(axis=(1, 2)) / 2
+
+
+def features(boards, player):
+    """
+    Termes de l'évaluation d'un lot de plateaux (tableau (N, 56)) du point de vue de `player` (1, -1 ou un
+    tableau de N joueurs) : un tableau (N, 7) dont les colonnes suivent EVALUATION_WEIGHTS. L'évaluation est la
+    combinaison linéaire de ces termes par les poids.
+    """
+    boards = np.asarray(boards, dtype=np.int8).reshape(-1, ROWS * COLS)
+    owners = np.sign(boards) * np.asarray(player).reshape(-1, 1)
+    kinds = np.abs(boards)
+    occupied = kinds > 0
+    allies = (owners > 0).astype(np.float64)
+
+    columns = np.empty((len(boards), len(EVALUATION_WEIGHTS)))
+    for kind in (1, 2, 3):
+        columns[:, kind - 1] = ((kinds == kind) * owners).sum(axis=1)
+    columns[:, 3] = (CENTER_BONUS * occupied * owners).sum(axis=1)
+    kings = allies * (kinds == 3)
+    columns[:, 4] = ((kings @ KING_NEIGHBORHOOD) * allies).sum(axis=1)
+    columns[:, 5] = _cohesion_pairs(allies)
+    columns[:, 6] = ~((owners < 0) & (kinds == 3)).any(axis=1)
+    return columns
+
+
+def evaluate_boards(boards, player, weights=DEFAULT_WEIGHTS):
+    """
+    Évalue un lot de plateaux (tableau (N, 56)) du point de vue de `player`, avec les mêmes termes et poids que
+    BaseAgent.evaluate : valeur et centralisation des pièces, protection du roi, cohésion des alliés et bonus
+    si l'adversaire n'a plus de roi. Renvoie un tableau de N scores.
+    """
+    return features(boards, player) @ np.asarray(weights)[:len(EVALUATION_WEIGHTS)]
+
+
+def evaluate_states(states, player, weights=DEFAULT_WEIGHTS):
+    """Évalue une liste d'états du point de vue de `player` (voir evaluate_boards)."""
+    return evaluate_boards(board_array(states), player, weights)
+
+
+def load_weights(path=DEFAULT_WEIGHTS_PATH):
+    """Charge un vecteur de poids écrit par `save_weights` (tableau NumPy .npy de WEIGHT_NAMES)."""
+    weights = np.load(path)
+    if weights.shape != DEFAULT_WEIGHTS.shape:
+        raise ValueError(f"{path} does not hold {len(WEIGHT_NAMES)} weights")
+    return weights.astype(np.float64)
+
+
+def save_weights(weights, path=DEFAULT_WEIGHTS_PATH):
+    """Écrit un vecteur de poids (dans l'ordre de WEIGHT_NAMES) au format NumPy .npy."""
+    with open(path, 'wb') as file:
+        np.save(file, np.asarray(weights, dtype=np.float64))
@@ -1,16 +1,202 @@
 from collections import namedtuple
-from copy import deepcopy
+from copy import copy
+import random
 
-FenixAction = namedtuple('FenixAction', ['start', 'end', 'removed'])
+FenixActionTuple = namedtuple('FenixActionTuple', ['start', 'end', 'removed'])
 """
-FenixAction represents a move in the Fenix board game.
+FenixActionTuple is the plain namedtuple form of a `FenixAction`, for code that needs a real tuple.
 
 Attributes:
     start (tuple): The (row, column) position of the piece before the move.
     end (tuple): The (row, column) position of the piece after the move.
-    removed (list of tuples): A list of (row, column) positions of pieces captured as a result of the move.
+    removed (frozenset of tuples): The (row, column) positions of pieces captured as a result of the move.
 """
 
+_zobrist_random = random.Random(0xF3E1)
+ZOBRIST_PIECES = {(i, j): tuple(_zobrist_random.getrandbits(64) if value != 3 else 0 for value in range(7))
+                  for i in range(7) for j in range(8)}
+"""
+Zobrist keys of the pieces: ZOBRIST_PIECES[(row, column)][value + 3] is the 64-bit key of a piece of the given
+value on that square. The keys are generated from a fixed seed so that hashes are stable across processes.
+"""
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+"""Zobrist key xored into the hash when player -1 is to move."""
+
+_ORTHOGONAL = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+_DIAGONAL = [(-1, -1), (-1, 1), (1, 1), (1, -1)]
+_POSITIONS = [(i, j) for i in range(7) for j in range(8)]
+
+
+def _inside(i, j):
+    return 0 <= i < 7 and 0 <= j < 8
+
+
+def _steps(directions):
+    # For every position: (neighbor, landing position behind the neighbor or None) per direction.
+    return {(i, j): tuple(((i+di, j+dj), (i+2*di, j+2*dj) if _inside(i+2*di, j+2*dj) else None)
+                          for di, dj in directions if _inside(i+di, j+dj))
+            for i, j in _POSITIONS}
+
+
+def _rays():
+    # For every position: the positions met when sliding in each direction, nearest first.
+    table = dict()
+    for i, j in _POSITIONS:
+        rays = (tuple((i+dist*di, j+dist*dj) for dist in range(1, 9) if _inside(i+dist*di, j+dist*dj))
+                for di, dj in _ORTHOGONAL)
+        table[(i, j)] = tuple(ray for ray in rays if ray)
+    return table
+
+
+SOLDIER_STEPS = _steps(_ORTHOGONAL)
+"""SOLDIER_STEPS[(row, column)] lists the orthogonal (neighbor, landing position or None) pairs of a position."""
+KING_STEPS = _steps(_ORTHOGONAL + _DIAGONAL)
+"""KING_STEPS[(row, column)] lists the (neighbor, landing position or None) pairs of a position in eight directions."""
+GENERAL_RAYS = _rays()
+"""GENERAL_RAYS[(row, column)] lists the non-empty orthogonal rays of a position, each ordered from the nearest position."""
+SQUARE_INDEX = {position: square for square, position in enumerate(_POSITIONS)}
+"""SQUARE_INDEX[(row, column)] is the square index row * 8 + column of a position."""
+SQUARE_BITS = {position: 1 << square for square, position in enumerate(_POSITIONS)}
+"""SQUARE_BITS[(row, column)] is the bit of a position in a removed-square mask."""
+
+
+class FenixAction:
+    """
+    FenixAction represents a move in the Fenix board game.
+
+    The move is packed in the integer `code`: start square, end square shifted by 6 bits and the mask of the
+    removed squares shifted by 12 bits (a square is row * 8 + column). Equality between actions only uses the code,
+    and the moves without capture are interned: `FenixAction(start, end, frozenset())` always returns the same object.
+    An action unpacks like the former namedtuple (`start, end, removed = action`), compares equal to a
+    `FenixActionTuple` with the same fields and hashes like it, so either can be looked up in a set or a dictionary
+    of actions; `to_namedtuple` converts it.
+
+    Attributes:
+        start (tuple): The (row, column) position of the piece before the move.
+        end (tuple): The (row, column) position of the piece after the move.
+        removed (frozenset of tuples): The (row, column) positions of pieces captured as a result of the move.
+        code (int): The packed move.
+    """
+    __slots__ = ('start', 'end', 'code', '_removed', '_hash')
+
+    def __new__(cls, start, end, removed=frozenset()):
+        try:
+            removed_mask = 0
+            for position in removed:
+                removed_mask |= SQUARE_BITS[position]
+            return _make_action(start, end, removed_mask)
+        except (KeyError, TypeError):
+            raise ValueError(f"Invalid action: {start}, {end}, {removed}") from None
+
+    @staticmethod
+    def from_mask(start, end, removed_mask):
+        """
+        Builds an action from the mask of its removed squares (see `removed_mask`).
+
+        Args:
+            start (tuple): The (row, column) position of the piece before the move.
+            end (tuple): The (row, column) position of the piece after the move.
+            removed_mask (int): The mask of the removed squares.
+
+        Returns:
+            FenixAction: The action, interned if it captures nothing.
+        """
+        return _make_action(start, end, removed_mask)
+
+    @staticmethod
+    def from_code(code):
+        """
+        Builds an action from its packed code (see `code`).
+
+        Args:
+            code (int): The packed move.
+
+        Returns:
+            FenixAction: The action, interned if it captures nothing.
+        """
+        return _action_from_code(code)
+
+    @property
+    def removed(self):
+        """frozenset of tuples: The (row, column) positions of the captured pieces, decoded from the code once."""
+        if self._removed is None:
+            removed_mask = self.code >> 12
+            self._removed = frozenset(_POSITIONS[square] for square in range(len(_POSITIONS))
+                                      if removed_mask >> square & 1)
+        return self._removed
+
+    @property
+    def removed_mask(self):
+        """int: The mask of the removed squares, bit row * 8 + column being set for each captured piece."""
+        return self.code >> 12
+
+    def to_namedtuple(self):
+        """
+        Converts the action to the equivalent namedtuple.
+
+        Returns:
+            FenixActionTuple: The action as a namedtuple.
+        """
+        return FenixActionTuple(self.start, self.end, self.removed)
+
+    def __eq__(self, other):
+        if isinstance(other, FenixAction):
+            return self.code == other.code
+        if isinstance(other, tuple) and len(other) == 3:
+            return self.start == other[0] and self.end == other[1] and self.removed == frozenset(other[2])
+        return NotImplemented
+
+    def __hash__(self):
+        # Same hash as the equal tuple, computed once (and when the action is created for interned moves).
+        if self._hash is None:
+            self._hash = hash((self.start, self.end, self.removed))
+        return self._hash
+
+    def __iter__(self):
+        return iter((self.start, self.end, self.removed))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.start, self.end, self.removed)[index]
+
+    def __repr__(self):
+        return f"FenixAction(start={self.start}, end={self.end}, removed={self.removed})"
+
+    def __reduce__(self):
+        return _action_from_code, (self.code,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _new_action(start, end, removed_mask):
+    action = object.__new__(FenixAction)
+    action.start = start
+    action.end = end
+    action.code = SQUARE_INDEX[start] | SQUARE_INDEX[end] << 6 | removed_mask << 12
+    action._removed = None if removed_mask else frozenset()
+    action._hash = None if removed_mask else hash((start, end, action._removed))
+    return action
+
+
+_QUIET_ACTIONS = {(start, end): _new_action(start, end, 0) for start in _POSITIONS for end in _POSITIONS}
+
+
+def _make_action(start, end, removed_mask):
+    # Moves without capture come from the intern table.
+    if removed_mask:
+        return _new_action(start, end, removed_mask)
+    return _QUIET_ACTIONS[(start, end)]
+
+
+def _action_from_code(code):
+    return _make_action(_POSITIONS[code & 63], _POSITIONS[code >> 6 & 63], code >> 12)
+
 class FenixState:
     """
     Represents the game state for the Fenix board game.
@@ -18,13 +204,16 @@ class FenixState:
     Attributes:
         dim (tuple): The dimensions of the board (rows, columns).
         pieces (dict): A dictionary mapping (row, column) positions to piece values.
+        piece_counts (dict): The number of pieces on the board for each piece value, kept up to date with `pieces`.
         turn (int): The current turn count.
         current_player (int): The player whose turn it is (1 or -1).
         can_create_general (bool): Flag indicating whether a general can be created.
         can_create_king (bool): Flag indicating whether a king can be created.
-        precomputed_hash (int or None): Cached hash of the board state.
-        history_boring_turn_hash (list): History of hashes for checking repetitions.
+        precomputed_hash (int or None): Zobrist hash of the board and player to move, updated incrementally.
+        repetition_counts (dict): Number of occurrences of each position hash since the last capture, for checking
+            repetitions in constant time.
         boring_turn (int): Counter for turns without a capture (used for draw conditions).
+        undo_stack (list): Records of the actions applied with `apply`, used by `undo`.
     """
     def __init__(self):
         """
@@ -40,108 +229,115 @@ class FenixState:
                 self.pieces[(diag_i-diag_j, diag_j)] = 1
                 self.pieces[(self.dim[0]-diag_i+diag_j-1, self.dim[1]-diag_j-1)] = -1
 
+        self.piece_counts = self._count_pieces()
+
         self.turn = 0
         self.current_player = 1
 
         self.can_create_general = False
         self.can_create_king = False
 
-        self.precomputed_hash = None
+        self.precomputed_hash = self._zobrist()
 
-        self.history_boring_turn_hash = []
+        self.repetition_counts = dict()
         self.boring_turn = 0
 
+        self.undo_stack = []
+
     def _is_inside(self, position):
         return 0 <= position[0] < self.dim[0] and 0 <= position[1] < self.dim[1]
 
+    def _count_pieces(self):
+        piece_counts = {value: 0 for value in (-3, -2, -1, 1, 2, 3)}
+        for value in self.pieces.values():
+            piece_counts[value] += 1
+        return piece_counts
+
     def _has_king(self, player):
-        return 3*player in self.pieces.values()
+        return self.piece_counts[3*player] > 0
 
     def _count_generals(self, player):
-        return list(self.pieces.values()).count(2*player)
+        return self.piece_counts[2*player]
 
     def _has_piece(self, player):
-        return len([p for p in self.pieces.values() if p * player > 0])
+        return self.piece_counts[player] + self.piece_counts[2*player] + self.piece_counts[3*player]
 
     def _setup_actions(self):
         actions = []
+        can_create_general = self._count_generals(self.current_player) < 4
+        can_create_king = not self._has_king(self.current_player)
         for position, value in self.pieces.items():
             if value != self.current_player:
                 continue
-            for direction_i, direction_j in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
-                neighbor_position = (position[0] + direction_i, position[1] + direction_j)
+            for neighbor_position, _ in SOLDIER_STEPS[position]:
                 if neighbor_position not in self.pieces:
                     continue
                 neighbor_type = self.pieces[neighbor_position]
-                if ((neighbor_type == self.current_player and self._count_generals(self.current_player) < 4) or
-                    (neighbor_type == 2*self.current_player and not self._has_king(self.current_player))):
-                    actions.append(FenixAction(position, neighbor_position, frozenset()))
+                if ((neighbor_type == self.current_player and can_create_general) or
+                    (neighbor_type == 2*self.current_player and can_create_king)):
+                    actions.append(_QUIET_ACTIONS[(position, neighbor_position)])
         return actions
 
     def _get_neighbors_soldier(self, start, end, removed, captured_units):
         neighbors = []
-        for dir_i, dir_j in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
-            neighbor_position = (end[0]+dir_i, end[1]+dir_j)
-            if not self._is_inside(neighbor_position):
-                continue
-            if neighbor_position in removed:
+        pieces = self.pieces
+        for neighbor_position, next_neighbor_position in SOLDIER_STEPS[end]:
+            neighbor_bit = SQUARE_BITS[neighbor_position]
+            if removed & neighbor_bit:
                 continue
-            next_neighbor_position = (neighbor_position[0]+dir_i, neighbor_position[1]+dir_j)
-            if (self.pieces.get(neighbor_position, 0) * self.current_player < 0 and
-                self._is_inside(next_neighbor_position) and
-                next_neighbor_position not in self.pieces):
-                neighbors.append((start, next_neighbor_position, removed.union([neighbor_position]), captured_units + abs(self.pieces[neighbor_position])))
+            neighbor_value = pieces.get(neighbor_position, 0)
+            if (neighbor_value * self.current_player < 0 and
+                next_neighbor_position is not None and
+                next_neighbor_position not in pieces):
+                neighbors.append((start, next_neighbor_position, removed | neighbor_bit, captured_units + abs(neighbor_value)))
                 continue
             if captured_units == 0:
-                if ((neighbor_position not in self.pieces) or
-                    (self.can_create_general and self.pieces[neighbor_position] == self.current_player) or
-                    (self.can_create_king and self.pieces[neighbor_position] == 2*self.current_player)):
+                if ((neighbor_position not in pieces) or
+                    (self.can_create_general and neighbor_value == self.current_player) or
+                    (self.can_create_king and neighbor_value == 2*self.current_player)):
                     neighbors.append((start, neighbor_position, removed, captured_units))
         return neighbors
 
     def _get_neighbors_general(self, start, end, removed, captured_units):
         neighbors = []
-        for dir_i, dir_j in [(-1, 0), (0, -1), (1, 0), (0, 1)]:
-            jumped = False
+        pieces = self.pieces
+        for ray in GENERAL_RAYS[end]:
             jumped_piece = None
-            for dist in range(1, 9):
-                neighbor_position = (end[0]+(dist*dir_i), end[1]+(dist*dir_j))
-                if not self._is_inside(neighbor_position):
+            for neighbor_position in ray:
+                neighbor_value = pieces.get(neighbor_position, 0)
+                if neighbor_value * self.current_player > 0:
                     break
-                if (neighbor_position in self.pieces) and (self.pieces[neighbor_position] * self.current_player > 0):
-                    break
-                if (neighbor_position in removed):
+                if removed & SQUARE_BITS[neighbor_position]:
                     break
 
-                if not jumped:
-                    if (neighbor_position not in self.pieces) and (captured_units == 0):
-                        neighbors.append((start, neighbor_position, removed, captured_units))
-                    elif (neighbor_position in self.pieces) and (self.pieces[neighbor_position] * self.current_player < 0):
-                        jumped = True
+                if jumped_piece is None:
+                    if neighbor_value == 0:
+                        if captured_units == 0:
+                            neighbors.append((start, neighbor_position, removed, captured_units))
+                    else:
                         jumped_piece = neighbor_position
                 else:
-                    if (neighbor_position not in self.pieces):
-                        neighbors.append((start, neighbor_position, removed.union([jumped_piece]), captured_units + abs(self.pieces[jumped_piece])))
-                    elif (neighbor_position in self.pieces) and (self.pieces[neighbor_position] * self.current_player < 0):
+                    if neighbor_value == 0:
+                        neighbors.append((start, neighbor_position, removed | SQUARE_BITS[jumped_piece], captured_units + abs(pieces[jumped_piece])))
+                    else:
                         break
         return neighbors
 
     def _get_neighbors_king(self, start, end, removed, captured_units):
         neighbors = []
-        for dir_i, dir_j in [(-1, 0), (0, -1), (1, 0), (0, 1), (-1, -1), (-1, 1), (1, 1), (1, -1)]:
-            neighbor_position = (end[0]+dir_i, end[1]+dir_j)
-            if not self._is_inside(neighbor_position):
-                continue
-            if neighbor_position in removed:
+        pieces = self.pieces
+        for neighbor_position, next_neighbor_position in KING_STEPS[end]:
+            neighbor_bit = SQUARE_BITS[neighbor_position]
+            if removed & neighbor_bit:
                 continue
-            next_neighbor_position = (neighbor_position[0]+dir_i, neighbor_position[1]+dir_j)
-            if (self.pieces.get(neighbor_position, 0) * self.current_player < 0 and
-                self._is_inside(next_neighbor_position) and
-                next_neighbor_position not in self.pieces):
-                neighbors.append((start, next_neighbor_position, removed.union([neighbor_position]), captured_units + abs(self.pieces[neighbor_position])))
+            neighbor_value = pieces.get(neighbor_position, 0)
+            if (neighbor_value * self.current_player < 0 and
+                next_neighbor_position is not None and
+                next_neighbor_position not in pieces):
+                neighbors.append((start, next_neighbor_position, removed | neighbor_bit, captured_units + abs(neighbor_value)))
                 continue
             if captured_units == 0:
-                if neighbor_position not in self.pieces:
+                if neighbor_position not in pieces:
                     neighbors.append((start, neighbor_position, removed, captured_units))
         return neighbors
 
@@ -160,15 +356,67 @@ class FenixState:
         for position, value in self.pieces.items():
             if value * self.current_player < 0:
                 continue
-            queue.append((position, position, frozenset(), 0))
+            queue.append((position, position, 0, 0))
+        # A chain state (start, end, removed) has the same continuations whatever the order in which its pieces
+        # were captured, so each one is recorded and expanded only once. Removed squares are kept as a bit mask.
+        visited = set()
         while len(queue) > 0:
             current_start, current_end, current_removed, current_captured_units = queue.pop()
             for neighbor in self._get_neighbors(current_start, current_end, current_removed, current_captured_units):
                 neighbor_start, neighbor_end, neighbor_removed, neighbor_captured_units = neighbor
-                action_container.add(FenixAction(neighbor_start, neighbor_end, neighbor_removed), neighbor_captured_units)
+                chain = (neighbor_start, neighbor_end, neighbor_removed)
+                if chain in visited:
+                    continue
+                visited.add(chain)
+                action_container.add(chain, neighbor_captured_units)
                 if current_captured_units < neighbor_captured_units:
                     queue.append(neighbor)
-        return action_container.get_actions()
+        return [_make_action(start, end, removed) for start, end, removed in action_container.get_actions()]
+
+    def _has_capture(self):
+        pieces = self.pieces
+        for position, value in pieces.items():
+            if value * self.current_player <= 0:
+                continue
+            if abs(value) == 2:
+                for ray in GENERAL_RAYS[position]:
+                    for distance, neighbor_position in enumerate(ray):
+                        if neighbor_position in pieces:
+                            if (pieces[neighbor_position] * self.current_player < 0 and
+                                distance + 1 < len(ray) and
+                                ray[distance + 1] not in pieces):
+                                return True
+                            break
+                continue
+            for neighbor_position, next_neighbor_position in (KING_STEPS if abs(value) == 3 else SOLDIER_STEPS)[position]:
+                if (pieces.get(neighbor_position, 0) * self.current_player < 0 and
+                    next_neighbor_position is not None and
+                    next_neighbor_position not in pieces):
+                    return True
+        return False
+
+    def _is_quiet_action(self, action):
+        start, end, removed = action
+        value = self.pieces.get(start, 0)
+        if len(removed) > 0 or value * self.current_player <= 0 or not self._is_inside(end):
+            return False
+        delta_i, delta_j = end[0] - start[0], end[1] - start[1]
+        if abs(value) == 1:
+            return abs(delta_i) + abs(delta_j) == 1 and (
+                (end not in self.pieces) or
+                (self.can_create_general and self.pieces[end] == self.current_player) or
+                (self.can_create_king and self.pieces[end] == 2*self.current_player))
+        if abs(value) == 3:
+            return max(abs(delta_i), abs(delta_j)) == 1 and end not in self.pieces
+        if (delta_i == 0) == (delta_j == 0):
+            return False
+        distance = abs(delta_i) + abs(delta_j)
+        step_i, step_j = delta_i // distance, delta_j // distance
+        return all((start[0]+(dist*step_i), start[1]+(dist*step_j)) not in self.pieces for dist in range(1, distance+1))
+
+    def _default_order(self, action):
+        captured_units = sum(abs(self.pieces[removed_piece]) for removed_piece in action.removed)
+        return 10*captured_units - abs(action.end[0] - self.dim[0]//2) - abs(action.end[1] - self.dim[1]//2)
 
     def to_move(self):
         """
@@ -190,6 +438,66 @@ class FenixState:
             return self._setup_actions()
         return self._max_actions()
 
+    def iter_actions(self, hints=(), key=None):
+        """
+        Yields the legal actions available in the current state lazily, in ordered stages.
+
+        The hints (for instance a killer move or a transposition table move) are yielded first if they are legal.
+        The other actions come next: captures, then moves creating a general or a king, then the other moves. A stage
+        is only generated once the previous ones have been consumed, so a search that stops after the first actions
+        skips most of the move generation. Within a stage, actions are sorted by decreasing `key` (by default, the
+        captured units and then the distance to the center of the board). Each legal action is yielded exactly once,
+        and the yielded actions are exactly those returned by `actions()`.
+
+        The state must be the same each time the generator is resumed (it may be modified with `apply` in between
+        as long as it is restored with `undo`).
+
+        Args:
+            hints (iterable of FenixAction or None): Actions to try first; illegal ones and None are skipped.
+            key (callable, optional): Function scoring an action, used to order the actions within a stage.
+
+        Yields:
+            FenixAction: The available actions.
+        """
+        key = key or self._default_order
+        yielded = set()
+
+        if self.turn < 10 or self._has_capture():
+            actions = set(self.actions())
+            for hint in hints:
+                if hint in actions and hint not in yielded:
+                    yielded.add(hint)
+                    yield hint
+            yield from sorted(actions - yielded, key=key, reverse=True)
+            return
+
+        # Without any capture, the maximum capture rule allows every move and a hint can be checked on its own.
+        for hint in hints:
+            if hint is not None and hint not in yielded and self._is_quiet_action(hint):
+                yielded.add(hint)
+                yield hint
+
+        if self.can_create_general or self.can_create_king:
+            promotions = []
+            for position, value in self.pieces.items():
+                if value != self.current_player:
+                    continue
+                for _, neighbor_position, _, _ in self._get_neighbors_soldier(position, position, 0, 0):
+                    action = _QUIET_ACTIONS[(position, neighbor_position)]
+                    if neighbor_position in self.pieces and action not in yielded:
+                        promotions.append(action)
+            yield from sorted(promotions, key=key, reverse=True)
+
+        moves = []
+        for position, value in self.pieces.items():
+            if value * self.current_player <= 0:
+                continue
+            for _, neighbor_position, _, _ in self._get_neighbors(position, position, 0, 0):
+                action = _QUIET_ACTIONS[(position, neighbor_position)]
+                if neighbor_position not in self.pieces and action not in yielded:
+                    moves.append(action)
+        yield from sorted(moves, key=key, reverse=True)
+
     def result(self, action):
         """
         Returns the state that results from applying a given action.
@@ -200,38 +508,130 @@ class FenixState:
         Returns:
             FenixState: The new game state after the action.
         """
-        state = deepcopy(self)
+        state = copy(self)
+        state.pieces = dict(self.pieces)
+        state.piece_counts = dict(self.piece_counts)
+        state.repetition_counts = dict(self.repetition_counts)
+        state.undo_stack = []
+        state._play(action)
+        return state
+
+    def apply(self, action):
+        """
+        Applies a given action to this state in place.
+
+        Everything needed to revert the action is pushed on `undo_stack`, so that a single state can be walked
+        through a search tree with `apply` and `undo` instead of creating one state per node with `result`.
+
+        Args:
+            action (FenixAction): The action to apply.
+        """
+        self.undo_stack.append(self._play(action))
+
+    def apply_null_move(self):
+        """
+        Passes the turn in place (a null move, which is not a legal action), for null-move pruning in a search.
 
+        The board, the boring turn counter and the repetition history are unchanged; the turn advances, the other
+        player is to move and can create neither a general nor a king. Reverted by `undo` like an action.
+        """
+        self.undo_stack.append((None, self.can_create_general, self.can_create_king, self.precomputed_hash))
+        self.can_create_general = False
+        self.can_create_king = False
+        self.turn += 1
+        self.current_player = -self.current_player
+        self.precomputed_hash = self._hash() ^ ZOBRIST_BLACK_TO_MOVE
+
+    def undo(self):
+        """
+        Reverts the last action (or null move) applied with `apply` (or `apply_null_move`).
+        """
+        record = self.undo_stack.pop()
+        if record[0] is None:
+            _, self.can_create_general, self.can_create_king, self.precomputed_hash = record
+            self.turn -= 1
+            self.current_player = -self.current_player
+            return
+        action, moved, stacked, captured, can_create_general, can_create_king, boring_turn, repetition_counts, precomputed_hash = record
+
+        self.pieces[action.start] = moved
+        if stacked:
+            self.pieces[action.end] = stacked
+            self.piece_counts[moved + stacked] -= 1
+            self.piece_counts[moved] += 1
+            self.piece_counts[stacked] += 1
+        else:
+            self.pieces.pop(action.end)
+        for removed_piece, removed_piece_value in captured:
+            self.pieces[removed_piece] = removed_piece_value
+            self.piece_counts[removed_piece_value] += 1
+
+        self.can_create_general = can_create_general
+        self.can_create_king = can_create_king
+
+        self.turn -= 1
+        self.current_player = -self.current_player
+
+        self.precomputed_hash = precomputed_hash
+
+        if repetition_counts is not None:
+            self.repetition_counts = repetition_counts
+        elif self.turn >= 10:
+            previous_hash = self._hash()
+            if self.repetition_counts[previous_hash] == 1:
+                del self.repetition_counts[previous_hash]
+            else:
+                self.repetition_counts[previous_hash] -= 1
+        self.boring_turn = boring_turn
+
+    def _play(self, action):
         start = action.start
         end = action.end
         removed = action.removed
 
-        state.pieces[end] = state.pieces.get(end, 0) + state.pieces[start]
-        state.pieces.pop(start)
+        previous_hash = self._hash()
+        previous_counts = self.repetition_counts if len(removed) > 0 else None
+        captured = []
+        record = (action, self.pieces[start], self.pieces.get(end, 0), captured,
+                  self.can_create_general, self.can_create_king, self.boring_turn, previous_counts, self.precomputed_hash)
+
+        moved = self.pieces.pop(start)
+        stacked = self.pieces.get(end, 0)
+        self.pieces[end] = stacked + moved
+        if stacked:
+            self.piece_counts[moved] -= 1
+            self.piece_counts[stacked] -= 1
+            self.piece_counts[moved + stacked] += 1
+        key = previous_hash ^ ZOBRIST_PIECES[start][moved + 3] ^ ZOBRIST_PIECES[end][stacked + 3] ^ ZOBRIST_PIECES[end][stacked + moved + 3]
 
-        state.can_create_general = False
-        state.can_create_king = False
+        self.can_create_general = False
+        self.can_create_king = False
         for removed_piece in removed:
-            removed_piece_type = abs(state.pieces[removed_piece])
-            if removed_piece_type == 2:
-                state.can_create_general = True
-            elif removed_piece_type == 3:
-                state.can_create_king = True
-            state.pieces.pop(removed_piece)
+            removed_piece_value = self.pieces.pop(removed_piece)
+            if abs(removed_piece_value) == 2:
+                self.can_create_general = True
+            elif abs(removed_piece_value) == 3:
+                self.can_create_king = True
+            captured.append((removed_piece, removed_piece_value))
+            self.piece_counts[removed_piece_value] -= 1
+            key ^= ZOBRIST_PIECES[removed_piece][removed_piece_value + 3]
 
-        state.turn += 1
-        state.current_player = -state.current_player
+        self.turn += 1
+        self.current_player = -self.current_player
 
-        state.precomputed_hash = None
+        self.precomputed_hash = key ^ ZOBRIST_BLACK_TO_MOVE
 
         if len(removed) > 0:
-            state.boring_turn = 0
-            state.history_boring_turn_hash = []
-        elif state.turn > 10:
-            state.boring_turn += 1
-            state.history_boring_turn_hash.append(self._hash())
+            self.boring_turn = 0
+            self.repetition_counts = dict()
+        elif self.turn > 10:
+            self.boring_turn += 1
+            self.repetition_counts[previous_hash] = self.repetition_counts.get(previous_hash, 0) + 1
 
-        return state
+        return record
+
+    def _repetitions(self):
+        return self.repetition_counts.get(self._hash(), 0)
 
     def is_terminal(self):
         """
@@ -240,7 +640,7 @@ class FenixState:
         Returns:
             bool: True if the game is over, False otherwise.
         """
-        if self.history_boring_turn_hash.count(self._hash()) >= 3:
+        if self._repetitions() >= 3:
             return True
         if self.boring_turn >= 50:
             return True
@@ -262,7 +662,7 @@ class FenixState:
         Returns:
             int: 1 if the player wins, -1 if the player loses, 0 for a draw or ongoing game.
         """
-        if self.history_boring_turn_hash.count(self._hash()) >= 3:
+        if self._repetitions() >= 3:
             return 0
         if self.boring_turn >= 50:
             return 0
@@ -299,9 +699,15 @@ class FenixState:
             board[position[0] * self.dim[1] + position[1]] = value
         return tuple(board)
 
+    def _zobrist(self):
+        key = ZOBRIST_BLACK_TO_MOVE if self.current_player == -1 else 0
+        for position, value in self.pieces.items():
+            key ^= ZOBRIST_PIECES[position][value + 3]
+        return key
+
     def _hash(self):
         if self.precomputed_hash is None:
-            self.precomputed_hash = hash(self._flatten())
+            self.precomputed_hash = self._zobrist()
         return self.precomputed_hash
 
     class _ActionContainer:
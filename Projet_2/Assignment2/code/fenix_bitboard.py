@@ -0,0 +1,583 @@
+from fenix import FenixAction, FenixState, ZOBRIST_BLACK_TO_MOVE, ZOBRIST_PIECES
+
+ROWS, COLS = 7, 8
+"""Board dimensions; square index of (row, column) is row * COLS + column."""
+
+_ORTHOGONAL = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+_DIAGONAL = [(-1, -1), (-1, 1), (1, 1), (1, -1)]
+
+SQUARES = [(i, j) for i in range(ROWS) for j in range(COLS)]
+"""SQUARES[square] gives the (row, column) position of a square index."""
+
+
+def _index(i, j):
+    if 0 <= i < ROWS and 0 <= j < COLS:
+        return i * COLS + j
+    return -1
+
+
+def _steps(directions):
+    # For every square: (neighbor, landing square behind the neighbor or -1) per direction.
+    table = []
+    for i, j in SQUARES:
+        steps = []
+        for di, dj in directions:
+            neighbor = _index(i + di, j + dj)
+            if neighbor < 0:
+                continue
+            steps.append((neighbor, _index(i + 2*di, j + 2*dj)))
+        table.append(tuple(steps))
+    return table
+
+
+def _rays():
+    table = []
+    for i, j in SQUARES:
+        rays = []
+        for di, dj in _ORTHOGONAL:
+            ray = []
+            dist = 1
+            while _index(i + dist*di, j + dist*dj) >= 0:
+                ray.append(_index(i + dist*di, j + dist*dj))
+                dist += 1
+            rays.append(tuple(ray))
+        table.append(tuple(rays))
+    return table
+
+
+_ZOBRIST = [ZOBRIST_PIECES[position] for position in SQUARES]
+_SOLDIER_STEPS = _steps(_ORTHOGONAL)
+_KING_STEPS = _steps(_ORTHOGONAL + _DIAGONAL)
+_GENERAL_RAYS = _rays()
+
+
+def _squares(bitboard):
+    while bitboard:
+        low = bitboard & -bitboard
+        yield low.bit_length() - 1
+        bitboard ^= low
+
+
+class BitboardFenixState:
+    """
+    Bitboard implementation of the Fenix game state.
+
+    The board is packed into one integer per piece value (soldier, general, king for each colour), bit
+    `row * 8 + column` being set when that square holds such a piece. It exposes the same public API as
+    `FenixState` (`to_move`, `actions`, `result`, `is_terminal`, `utility`) and produces the same
+    `FenixAction` objects, so it can be used in place of `FenixState` by agents and game managers. Creating a
+    child state only copies a handful of integers instead of deep-copying the `pieces` dictionary, and `apply` and
+    `undo` walk a single state through a search tree by flipping the bits of the moved and captured pieces.
+
+    Attributes:
+        dim (tuple): The dimensions of the board (rows, columns).
+        boards (list): Seven bitboards indexed by piece value + 3 (index 3, the empty value, is always 0).
+        turn (int): The current turn count.
+        current_player (int): The player whose turn it is (1 or -1).
+        can_create_general (bool): Flag indicating whether a general can be created.
+        can_create_king (bool): Flag indicating whether a king can be created.
+        precomputed_hash (int or None): Zobrist hash of the board and player to move, as in `FenixState`.
+        repetition_counts (dict): Number of occurrences of each position hash since the last capture, as in
+            `FenixState`. Each state has its own, updated in place by `apply` and `undo`.
+        boring_turn (int): Counter for turns without a capture (used for draw conditions).
+        undo_stack (list): Records of the actions applied with `apply`, used by `undo`.
+    """
+    dim = (ROWS, COLS)
+
+    def __init__(self):
+        """
+        Initializes a new BitboardFenixState with the starting configuration.
+        """
+        self._load(FenixState())
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Builds a bitboard state equivalent to a dict-based `FenixState`.
+
+        Args:
+            state (FenixState): The state to convert.
+
+        Returns:
+            BitboardFenixState: The converted state.
+        """
+        bitboard_state = cls.__new__(cls)
+        bitboard_state._load(state)
+        return bitboard_state
+
+    @classmethod
+    def from_pieces(cls, pieces, current_player=1, turn=0):
+        """
+        Builds a bitboard state from a `pieces` dictionary.
+
+        Args:
+            pieces (dict): A dictionary mapping (row, column) positions to piece values.
+            current_player (int): The player whose turn it is (1 or -1).
+            turn (int): The current turn count.
+
+        Returns:
+            BitboardFenixState: The new state, with no capture flags and an empty repetition history.
+        """
+        state = FenixState()
+        state.pieces = dict(pieces)
+        state.current_player = current_player
+        state.turn = turn
+        return cls.from_state(state)
+
+    def _load(self, state):
+        boards = [0] * 7
+        for (i, j), value in state.pieces.items():
+            boards[value + 3] |= 1 << (i * COLS + j)
+        self.boards = boards
+        self.turn = state.turn
+        self.current_player = state.current_player
+        self.can_create_general = state.can_create_general
+        self.can_create_king = state.can_create_king
+        self.precomputed_hash = self._zobrist()
+        self.repetition_counts = dict(state.repetition_counts)
+        self.boring_turn = state.boring_turn
+        self.undo_stack = []
+
+    @property
+    def pieces(self):
+        """
+        dict: The board as a dictionary mapping (row, column) positions to piece values, as in `FenixState`.
+        """
+        pieces = dict()
+        for value in (-3, -2, -1, 1, 2, 3):
+            for square in _squares(self.boards[value + 3]):
+                pieces[SQUARES[square]] = value
+        return pieces
+
+    @property
+    def piece_counts(self):
+        """
+        dict: The number of pieces on the board for each piece value, as in `FenixState`.
+        """
+        return {value: self.boards[value + 3].bit_count() for value in (-3, -2, -1, 1, 2, 3)}
+
+    def to_state(self):
+        """
+        Converts this state to an equivalent dict-based `FenixState`.
+
+        Returns:
+            FenixState: The converted state.
+        """
+        state = FenixState()
+        state.pieces = self.pieces
+        state.piece_counts = state._count_pieces()
+        state.turn = self.turn
+        state.current_player = self.current_player
+        state.precomputed_hash = self._hash()
+        state.can_create_general = self.can_create_general
+        state.can_create_king = self.can_create_king
+        state.repetition_counts = dict(self.repetition_counts)
+        state.boring_turn = self.boring_turn
+        return state
+
+    def _player_board(self, player):
+        boards = self.boards
+        return boards[player + 3] | boards[2*player + 3] | boards[3*player + 3]
+
+    def _value_at(self, square):
+        bit = 1 << square
+        for index, board in enumerate(self.boards):
+            if board & bit:
+                return index - 3
+        return 0
+
+    def _player_value_at(self, square, player):
+        bit = 1 << square
+        boards = self.boards
+        if boards[player + 3] & bit:
+            return player
+        if boards[2*player + 3] & bit:
+            return 2*player
+        if boards[3*player + 3] & bit:
+            return 3*player
+        return 0
+
+    def _has_king(self, player):
+        return self.boards[3*player + 3] != 0
+
+    def _count_generals(self, player):
+        return self.boards[2*player + 3].bit_count()
+
+    def _has_piece(self, player):
+        return self._player_board(player).bit_count()
+
+    def _setup_actions(self):
+        player = self.current_player
+        soldiers = self.boards[player + 3]
+        generals = self.boards[2*player + 3]
+        stack_soldier = self._count_generals(player) < 4
+        stack_general = not self._has_king(player)
+        actions = []
+        for square in _squares(soldiers):
+            for neighbor, _ in _SOLDIER_STEPS[square]:
+                bit = 1 << neighbor
+                if (stack_soldier and soldiers & bit) or (stack_general and generals & bit):
+                    actions.append(FenixAction.from_mask(SQUARES[square], SQUARES[neighbor], 0))
+        return actions
+
+    def _captured_units(self, square):
+        bit = 1 << square
+        boards = self.boards
+        for units in (1, 2, 3):
+            if (boards[units + 3] | boards[3 - units]) & bit:
+                return units
+        return 0
+
+    def _has_capture(self):
+        player = self.current_player
+        boards = self.boards
+        theirs = self._player_board(-player)
+        occupied = self._player_board(player) | theirs
+        for piece_type, steps in ((1, _SOLDIER_STEPS), (3, _KING_STEPS)):
+            for square in _squares(boards[piece_type*player + 3]):
+                for neighbor, landing in steps[square]:
+                    if theirs & (1 << neighbor) and landing >= 0 and not occupied & (1 << landing):
+                        return True
+        for square in _squares(boards[2*player + 3]):
+            for ray in _GENERAL_RAYS[square]:
+                for distance, neighbor in enumerate(ray):
+                    if occupied & (1 << neighbor):
+                        if theirs & (1 << neighbor) and distance + 1 < len(ray) and not occupied & (1 << ray[distance + 1]):
+                            return True
+                        break
+        return False
+
+    def _max_actions(self):
+        player = self.current_player
+        boards = self.boards
+        mine = self._player_board(player)
+        theirs = self._player_board(-player)
+        occupied = mine | theirs
+        own_soldiers = boards[player + 3] if self.can_create_general else 0
+        own_generals = boards[2*player + 3] if self.can_create_king else 0
+
+        found = []
+        max_captured_units = 0
+        queue = []
+        visited = set()
+        for piece_type in (1, 2, 3):
+            for square in _squares(boards[piece_type*player + 3]):
+                queue.append((piece_type, square, square, 0, 0))
+
+        while queue:
+            piece_type, start, end, removed, captured_units = queue.pop()
+            neighbors = []
+            if piece_type == 2:
+                for ray in _GENERAL_RAYS[end]:
+                    jumped = -1
+                    for square in ray:
+                        bit = 1 << square
+                        if mine & bit or removed & bit:
+                            break
+                        if jumped < 0:
+                            if not occupied & bit:
+                                if captured_units == 0:
+                                    neighbors.append((square, removed, captured_units))
+                            else:
+                                jumped = square
+                        elif not occupied & bit:
+                            neighbors.append((square, removed | (1 << jumped), captured_units + self._captured_units(jumped)))
+                        else:
+                            break
+            else:
+                for neighbor, landing in (_SOLDIER_STEPS if piece_type == 1 else _KING_STEPS)[end]:
+                    bit = 1 << neighbor
+                    if removed & bit:
+                        continue
+                    if theirs & bit and landing >= 0 and not occupied & (1 << landing):
+                        neighbors.append((landing, removed | bit, captured_units + self._captured_units(neighbor)))
+                        continue
+                    if captured_units == 0:
+                        if not occupied & bit or (piece_type == 1 and (own_soldiers | own_generals) & bit):
+                            neighbors.append((neighbor, removed, captured_units))
+
+            for neighbor_end, neighbor_removed, neighbor_captured_units in neighbors:
+                # Each chain state is expanded once, whatever the order of the captures that reached it.
+                if (start, neighbor_end, neighbor_removed) in visited:
+                    continue
+                visited.add((start, neighbor_end, neighbor_removed))
+                if neighbor_captured_units > max_captured_units:
+                    max_captured_units = neighbor_captured_units
+                    found = []
+                if neighbor_captured_units == max_captured_units:
+                    found.append((start, neighbor_end, neighbor_removed))
+                if captured_units < neighbor_captured_units:
+                    queue.append((piece_type, start, neighbor_end, neighbor_removed, neighbor_captured_units))
+
+        return [FenixAction.from_mask(SQUARES[start], SQUARES[end], removed) for start, end, removed in found]
+
+    def to_move(self):
+        """
+        Returns the player whose turn it is to move.
+
+        Returns:
+            int: The player whose turn it is (1 or -1).
+        """
+        return self.current_player
+
+    def actions(self):
+        """
+        Returns the list of legal actions available in the current state.
+
+        Returns:
+            list of FenixAction: The available actions.
+        """
+        if self.turn < 10:
+            return self._setup_actions()
+        return self._max_actions()
+
+    def iter_actions(self, hints=(), key=None):
+        """
+        Yields the legal actions, the legal hints first, as `FenixState.iter_actions` does.
+
+        Args:
+            hints (iterable of FenixAction or None): Actions to try first; illegal ones and None are skipped.
+            key (callable, optional): Function scoring an action, used to order the other actions.
+
+        Yields:
+            FenixAction: The available actions.
+        """
+        actions = set(self.actions())
+        yielded = set()
+        for hint in hints:
+            if hint in actions and hint not in yielded:
+                yielded.add(hint)
+                yield hint
+        yield from sorted(actions - yielded, key=key or self._default_order, reverse=True)
+
+    def _default_order(self, action):
+        captured_units = sum(self._captured_units(i * COLS + j) for i, j in action.removed)
+        return 10*captured_units - abs(action.end[0] - ROWS//2) - abs(action.end[1] - COLS//2)
+
+    def result(self, action):
+        """
+        Returns the state that results from applying a given action.
+
+        Args:
+            action (FenixAction): The action to apply.
+
+        Returns:
+            BitboardFenixState: The new game state after the action.
+        """
+        start = action.start[0] * COLS + action.start[1]
+        end = action.end[0] * COLS + action.end[1]
+        boards = list(self.boards)
+
+        moving = self._player_value_at(start, self.current_player)
+        stacked = self._player_value_at(end, self.current_player)
+        boards[moving + 3] ^= 1 << start
+        if stacked:
+            boards[stacked + 3] ^= 1 << end
+        boards[moving + stacked + 3] |= 1 << end
+        key = self._hash() ^ _ZOBRIST[start][moving + 3] ^ _ZOBRIST[end][stacked + 3] ^ _ZOBRIST[end][moving + stacked + 3]
+
+        can_create_general = False
+        can_create_king = False
+        for i, j in action.removed:
+            square = i * COLS + j
+            removed_value = self._player_value_at(square, -self.current_player)
+            if abs(removed_value) == 2:
+                can_create_general = True
+            elif abs(removed_value) == 3:
+                can_create_king = True
+            boards[removed_value + 3] ^= 1 << square
+            key ^= _ZOBRIST[square][removed_value + 3]
+
+        state = self.__class__.__new__(self.__class__)
+        state.boards = boards
+        state.turn = self.turn + 1
+        state.current_player = -self.current_player
+        state.can_create_general = can_create_general
+        state.can_create_king = can_create_king
+        state.precomputed_hash = key ^ ZOBRIST_BLACK_TO_MOVE
+
+        if len(action.removed) > 0:
+            state.boring_turn = 0
+            state.repetition_counts = dict()
+        elif state.turn > 10:
+            state.boring_turn = self.boring_turn + 1
+            state.repetition_counts = dict(self.repetition_counts)
+            state.repetition_counts[self._hash()] = self.repetition_counts.get(self._hash(), 0) + 1
+        else:
+            state.boring_turn = self.boring_turn
+            state.repetition_counts = dict(self.repetition_counts)
+        state.undo_stack = []
+
+        return state
+
+    def apply(self, action):
+        """
+        Applies a given action to this state in place, as `FenixState.apply` does: the bits of the moved, stacked
+        and captured pieces are flipped and what is needed to revert them is pushed on `undo_stack`.
+
+        Args:
+            action (FenixAction): The action to apply.
+        """
+        code = action.code
+        start = code & 63
+        end = code >> 6 & 63
+        boards = self.boards
+
+        player = self.current_player
+        previous_hash = self._hash()
+        moving = self._player_value_at(start, player)
+        stacked = self._player_value_at(end, player)
+        captured = []
+        previous_counts = self.repetition_counts if code >> 12 else None
+        self.undo_stack.append((start, end, moving, stacked, captured, self.can_create_general, self.can_create_king,
+                                self.boring_turn, previous_counts, previous_hash))
+
+        boards[moving + 3] ^= 1 << start
+        if stacked:
+            boards[stacked + 3] ^= 1 << end
+        boards[moving + stacked + 3] |= 1 << end
+        key = previous_hash ^ _ZOBRIST[start][moving + 3] ^ _ZOBRIST[end][stacked + 3] ^ _ZOBRIST[end][moving + stacked + 3]
+
+        self.can_create_general = False
+        self.can_create_king = False
+        for square in _squares(code >> 12):
+            removed_value = self._player_value_at(square, -player)
+            if abs(removed_value) == 2:
+                self.can_create_general = True
+            elif abs(removed_value) == 3:
+                self.can_create_king = True
+            boards[removed_value + 3] ^= 1 << square
+            key ^= _ZOBRIST[square][removed_value + 3]
+            captured.append((square, removed_value))
+
+        self.turn += 1
+        self.current_player = -player
+        self.precomputed_hash = key ^ ZOBRIST_BLACK_TO_MOVE
+
+        if captured:
+            self.boring_turn = 0
+            self.repetition_counts = dict()
+        elif self.turn > 10:
+            self.boring_turn += 1
+            self.repetition_counts[previous_hash] = self.repetition_counts.get(previous_hash, 0) + 1
+
+    def apply_null_move(self):
+        """
+        Passes the turn in place (a null move, which is not a legal action), as `FenixState.apply_null_move` does.
+        Reverted by `undo` like an action.
+        """
+        self.undo_stack.append((None, self.can_create_general, self.can_create_king, self._hash()))
+        self.can_create_general = False
+        self.can_create_king = False
+        self.turn += 1
+        self.current_player = -self.current_player
+        self.precomputed_hash = self._hash() ^ ZOBRIST_BLACK_TO_MOVE
+
+    def undo(self):
+        """
+        Reverts the last action (or null move) applied with `apply` (or `apply_null_move`).
+        """
+        record = self.undo_stack.pop()
+        if record[0] is None:
+            _, self.can_create_general, self.can_create_king, self.precomputed_hash = record
+            self.turn -= 1
+            self.current_player = -self.current_player
+            return
+        (start, end, moving, stacked, captured, can_create_general, can_create_king, boring_turn, previous_counts,
+         previous_hash) = record
+
+        boards = self.boards
+        boards[moving + stacked + 3] ^= 1 << end
+        if stacked:
+            boards[stacked + 3] |= 1 << end
+        boards[moving + 3] |= 1 << start
+        for square, removed_value in captured:
+            boards[removed_value + 3] |= 1 << square
+
+        self.can_create_general = can_create_general
+        self.can_create_king = can_create_king
+        self.turn -= 1
+        self.current_player = -self.current_player
+        self.precomputed_hash = previous_hash
+
+        if previous_counts is not None:
+            self.repetition_counts = previous_counts
+        elif self.turn >= 10:
+            if self.repetition_counts[previous_hash] == 1:
+                del self.repetition_counts[previous_hash]
+            else:
+                self.repetition_counts[previous_hash] -= 1
+        self.boring_turn = boring_turn
+
+    def _repetitions(self):
+        return self.repetition_counts.get(self._hash(), 0)
+
+    def is_terminal(self):
+        """
+        Determines if the game has reached a terminal state.
+
+        Returns:
+            bool: True if the game is over, False otherwise.
+        """
+        if self._repetitions() >= 3:
+            return True
+        if self.boring_turn >= 50:
+            return True
+        if self.turn <= 10 and len(self.actions()) == 0:
+            return True
+        if self.turn > 10 and not self._has_king(-self.current_player):
+            return True
+        if not self._has_piece(1) or not self._has_piece(-1):
+            return True
+        return False
+
+    def utility(self, player):
+        """
+        Computes the utility value for the given player.
+
+        Args:
+            player (int): The player for whom to calculate the utility (1 or -1).
+
+        Returns:
+            int: 1 if the player wins, -1 if the player loses, 0 for a draw or ongoing game.
+        """
+        if self._repetitions() >= 3:
+            return 0
+        if self.boring_turn >= 50:
+            return 0
+        if self.turn <= 10 and len(self.actions()) == 0:
+            return -1 if player == self.current_player else 1
+        if self.turn > 10 and not self._has_king(-self.current_player):
+            return 1 if player == self.current_player else -1
+        player_has_piece = self._has_piece(player)
+        opponent_has_piece = self._has_piece(-player)
+        if not player_has_piece and not opponent_has_piece:
+            return 0
+        if not player_has_piece:
+            return -1
+        if not opponent_has_piece:
+            return 1
+        return 0
+
+    def __str__(self):
+        return str(self.to_state())
+
+    def _flatten(self):
+        board = [0] * (ROWS * COLS)
+        for value in (-3, -2, -1, 1, 2, 3):
+            for square in _squares(self.boards[value + 3]):
+                board[square] = value
+        return tuple(board)
+
+    def _zobrist(self):
+        key = ZOBRIST_BLACK_TO_MOVE if self.current_player == -1 else 0
+        for value in (-3, -2, -1, 1, 2, 3):
+            for square in _squares(self.boards[value + 3]):
+                key ^= _ZOBRIST[square][value + 3]
+        return key
+
+    def _hash(self):
+        # Same keys as FenixState._hash so histories can be converted between both representations.
+        if self.precomputed_hash is None:
+            self.precomputed_hash = self._zobrist()
+        return self.precomputed_hash
@@ -3,7 +3,7 @@ import time
 from copy import deepcopy
 
 class TextGameManager:
-    def __init__(self, agent_1, agent_2, time_limit=300, display=True):
+    def __init__(self, agent_1, agent_2, time_limit=300, display=True, ponder=False):
         self.agent_1 = agent_1
         self.remaining_time_1 = time_limit
 
@@ -12,6 +12,9 @@ class TextGameManager:
 
         self.dim = (7, 9)
         self.display = display
+        # Pondering: after each move, the agent may search during the opponent's time (see Agent.ponder). BaseAgent
+        # ponders in a low-priority process, which only uses the CPU time left free by the opponent.
+        self.ponder = ponder
 
     def play(self):
         state = fenix.FenixState()
@@ -29,6 +32,8 @@ class TextGameManager:
             action = None
             copy_state = deepcopy(state)
             start_time = time.perf_counter()
+            if self.ponder:
+                agent.stop_pondering()
             action = agent.act(copy_state, remaining_time)
             remaining_time -= time.perf_counter() - start_time
 
@@ -43,6 +48,11 @@ class TextGameManager:
                 return -1 if state.to_move() == 1 else 1, -1 if state.to_move() == -1 else 1
 
             state = state.result(action)
+            # Copying the state and starting the background search are charged to the agent that moved.
+            if self.ponder and not state.is_terminal():
+                ponder_start = time.perf_counter()
+                agent.ponder(deepcopy(state))
+                remaining_time -= time.perf_counter() - ponder_start
             if self.display:
                 print(f"========== Turn: {turn+1:3} ==========")
                 print(f"\nChosen action: {action}\n")
@@ -55,6 +65,10 @@ class TextGameManager:
 
             turn += 1
 
+        if self.ponder:
+            self.agent_1.stop_pondering()
+            self.agent_2.stop_pondering()
+
         if self.display:
             print(f"========== Game Over ==========")
 
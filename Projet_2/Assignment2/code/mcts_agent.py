@@ -0,0 +1,252 @@
+import math
+import random
+import time
+from copy import deepcopy
+
+import numpy as np
+
+from agent import Agent
+from evaluation import evaluate_boards
+from fenix import FenixAction
+from transposition import position_key
+
+
+class MCTSAgent(Agent):
+    """
+    Agent Monte-Carlo (UCT) : sélection par UCB1, expansion de tous les coups d'une feuille, simulations
+    (« playouts ») depuis la feuille et rétropropagation du résultat.
+
+    L'arbre est stocké dans des tableaux NumPy préalloués, indexés par numéro de nœud : les enfants d'un nœud
+    occupent des numéros consécutifs (`first_child`, `n_children`) et le coup qui mène à un nœud est codé par
+    ses cases (départ | arrivée << 6) et le masque des cases prises (voir `FenixAction.code`). Après chaque coup,
+    le sous-arbre de la position atteinte (notre coup puis celui de l'adversaire) est gardé pour le tour suivant.
+
+    Les simulations partent toutes de la même feuille par lots de `batch_size` : elles jouent au plus
+    `playout_depth` demi-coups selon `policy` ('random' : coup uniforme, comme RandomAgent ; 'heuristic' : une
+    fois sur deux, le coup qui prend le plus et se rapproche du centre), puis les plateaux non terminés du lot
+    sont évalués ensemble par evaluation.evaluate_boards.
+
+    Attributes:
+        visits (np.ndarray): Nombre de passages par nœud.
+        value_sum (np.ndarray): Somme des résultats (entre -1 et 1) du point de vue du joueur qui a joué le coup
+            menant au nœud.
+        mover (np.ndarray): Joueur qui a joué le coup menant au nœud.
+        first_child (np.ndarray): Numéro du premier enfant (-1 si le nœud n'est pas développé).
+        n_children (np.ndarray): Nombre d'enfants.
+        move_squares (np.ndarray): Cases de départ et d'arrivée du coup menant au nœud.
+        move_removed (np.ndarray): Masque des cases prises par ce coup.
+        size (int): Nombre de nœuds utilisés.
+        root (int): Numéro de la racine.
+        iterations (int): Nombre d'itérations (descente et lot de simulations) du dernier coup.
+    """
+    EXPLORATION = 1.4
+    """Constante d'exploration de UCB1."""
+    EVALUATION_SCALE = 10.0
+    """Échelle de l'évaluation d'une simulation non terminée : le résultat vaut tanh(écart d'évaluation / échelle)."""
+
+    def __init__(self, player, capacity=500_000, policy='heuristic', playout_depth=40, batch_size=4):
+        """
+        `capacity` est le nombre maximal de nœuds de l'arbre ; `policy`, `playout_depth` et `batch_size`
+        décrivent les simulations (voir la classe).
+        """
+        super().__init__(player)
+        if policy not in ('random', 'heuristic'):
+            raise ValueError(f"Unknown playout policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.playout_depth = playout_depth
+        self.batch_size = batch_size
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.value_sum = np.zeros(capacity, dtype=np.float64)
+        self.mover = np.zeros(capacity, dtype=np.int8)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.n_children = np.zeros(capacity, dtype=np.int32)
+        self.move_squares = np.zeros(capacity, dtype=np.uint16)
+        self.move_removed = np.zeros(capacity, dtype=np.uint64)
+        self.size = 0
+        self.root = -1
+        self.root_state = None
+        self.root_move = None
+        self.iterations = 0
+
+    def act(self, state, remaining_time):
+        """Fait des simulations pendant le temps alloué et joue le coup le plus visité de la racine."""
+        start_time = time.perf_counter()
+        moves = state.actions()
+        if not moves:
+            return None
+        if len(moves) == 1:
+            return moves[0]
+
+        deadline = start_time + self.allocate_time(state, remaining_time)
+        self._set_root(state)
+        self.iterations = 0
+        # Une itération coûte quelques millisecondes : l'échéance est vérifiée après chacune.
+        while True:
+            self._iterate(state)
+            self.iterations += 1
+            if time.perf_counter() > deadline:
+                break
+
+        children = self._children(self.root)
+        if not len(children):
+            return random.choice(moves)
+        move = self._move(children[int(np.argmax(self.visits[children]))])
+        self.root_state = deepcopy(state)
+        self.root_move = move
+        return move if move in moves else random.choice(moves)
+
+    def _children(self, node):
+        first = self.first_child[node]
+        return np.arange(first, first + self.n_children[node])
+
+    def _move(self, node):
+        return FenixAction.from_code(int(self.move_squares[node]) | int(self.move_removed[node]) << 12)
+
+    def _new_node(self, mover):
+        self.size = 1
+        self.visits[0] = 0
+        self.value_sum[0] = 0.0
+        self.mover[0] = mover
+        self.first_child[0] = -1
+        self.n_children[0] = 0
+        return 0
+
+    def _set_root(self, state):
+        # Réutilise le sous-arbre de la position atteinte depuis la racine précédente, s'il existe.
+        root = None
+        if self.root_state is not None and self.root >= 0:
+            key = position_key(state)
+            previous = self.root_state
+            for child in self._children(self.root):
+                if self._move(child) != self.root_move or self.first_child[child] < 0:
+                    continue
+                previous.apply(self.root_move)
+                for grandchild in self._children(child):
+                    previous.apply(self._move(grandchild))
+                    if position_key(previous) == key and previous.turn == state.turn:
+                        root = int(grandchild)
+                    previous.undo()
+                    if root is not None:
+                        break
+                previous.undo()
+                break
+        self.root_state = None
+        if root is None:
+            self.root = self._new_node(-state.current_player)
+        elif self.size > self.capacity // 2:
+            self.root = self._compact(root)
+        else:
+            self.root = root
+
+    def _compact(self, root):
+        # Recopie le sous-arbre de `root` au début des tableaux, en gardant les enfants de chaque nœud consécutifs.
+        arrays = (self.visits, self.value_sum, self.mover, self.first_child, self.n_children, self.move_squares,
+                  self.move_removed)
+        old = [root]
+        new_first = []
+        size = 1
+        index = 0
+        while index < len(old):
+            node = old[index]
+            if self.first_child[node] >= 0:
+                new_first.append(size)
+                old.extend(range(self.first_child[node], self.first_child[node] + self.n_children[node]))
+                size += int(self.n_children[node])
+            else:
+                new_first.append(-1)
+            index += 1
+        order = np.array(old, dtype=np.int64)
+        for array in arrays:
+            array[:size] = array[order]
+        self.first_child[:size] = new_first
+        self.size = size
+        return 0
+
+    def _expand(self, node, state):
+        moves = state.actions()
+        first = self.size
+        if not moves or first + len(moves) > self.capacity:
+            return False
+        last = first + len(moves)
+        self.visits[first:last] = 0
+        self.value_sum[first:last] = 0.0
+        self.mover[first:last] = state.current_player
+        self.first_child[first:last] = -1
+        self.n_children[first:last] = 0
+        self.move_squares[first:last] = [move.code & 0xFFF for move in moves]
+        self.move_removed[first:last] = [move.code >> 12 for move in moves]
+        self.first_child[node] = first
+        self.n_children[node] = len(moves)
+        self.size = last
+        return True
+
+    def _select(self, node):
+        children = self._children(node)
+        visits = self.visits[children]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return int(children[unvisited[random.randrange(len(unvisited))]])
+        scores = (self.value_sum[children] / visits +
+                  self.EXPLORATION * np.sqrt(math.log(self.visits[node]) / visits))
+        return int(children[int(np.argmax(scores))])
+
+    def _iterate(self, state):
+        # Une itération : descente jusqu'à une feuille, expansion, lot de simulations et rétropropagation.
+        path = [self.root]
+        node = self.root
+        while self.first_child[node] >= 0 and not state.is_terminal():
+            node = self._select(node)
+            state.apply(self._move(node))
+            path.append(node)
+        if not state.is_terminal() and self.visits[node] > 0 and self._expand(node, state):
+            node = self._select(node)
+            state.apply(self._move(node))
+            path.append(node)
+
+        results = self._playouts(state)
+        path = np.array(path)
+        self.visits[path] += len(results)
+        self.value_sum[path] += results.sum() * self.mover[path]
+        for _ in range(len(path) - 1):
+            state.undo()
+
+    def _playouts(self, state):
+        # Résultats (du point de vue du joueur 1) d'un lot de simulations depuis l'état, restauré ensuite.
+        if state.is_terminal():
+            return np.array([float(state.utility(1))])
+        results = np.zeros(self.batch_size)
+        boards = []
+        unfinished = []
+        for index in range(self.batch_size):
+            played = 0
+            stuck = False
+            while played < self.playout_depth and not state.is_terminal():
+                move = self._playout_move(state)
+                if move is None:
+                    stuck = True
+                    break
+                state.apply(move)
+                played += 1
+            if state.is_terminal():
+                results[index] = state.utility(1)
+            elif stuck:
+                # Sans coup légal, le joueur au trait perd, comme dans TextGameManager.
+                results[index] = -state.current_player
+            else:
+                boards.append(state._flatten())
+                unfinished.append(index)
+            for _ in range(played):
+                state.undo()
+        if boards:
+            gaps = (evaluate_boards(boards, 1) - evaluate_boards(boards, -1)) / 2
+            results[unfinished] = np.tanh(gaps / self.EVALUATION_SCALE)
+        return results
+
+    def _playout_move(self, state):
+        moves = state.actions()
+        if not moves:
+            return None
+        if self.policy == 'heuristic' and random.random() < 0.5:
+            return max(moves, key=state._default_order)
+        return random.choice(moves)
@@ -0,0 +1,72 @@
+PIECE_VALUES = (0, 1, 3, 5)
+"""Valeur d'une pièce selon sa valeur absolue (soldat, général, roi), comme dans `BaseAgent.evaluate`."""
+
+CAPTURE_SCORES = tuple(16 * PIECE_VALUES[victim] - PIECE_VALUES[attacker] for victim in range(4) for attacker in range(4))
+"""
+Score MVV-LVA (« most valuable victim, least valuable attacker ») d'une pièce prise, indexé par
+victime * 4 + attaquant (valeurs absolues) : la victime la plus précieuse d'abord, puis l'attaquant le moins précieux.
+"""
+
+KILLER_SLOTS = 2
+"""Nombre de coups meurtriers gardés par ply."""
+
+
+class MoveOrdering:
+    """
+    Ordre des coups de la recherche alpha-bêta, appris pendant la recherche.
+
+    - Coups meurtriers (« killer moves ») : par ply, les derniers coups tranquilles ayant causé une coupure, essayés
+      juste après le coup de la table de transposition.
+    - Table d'historique (« butterfly ») indexée par (départ, arrivée) : chaque coupure par un coup tranquille lui
+      ajoute profondeur², ce qui classe les coups tranquilles entre eux.
+    - Captures classées par MVV-LVA (`CAPTURE_SCORES`), sans recalculer de table à chaque nœud.
+
+    Attributes:
+        killers (list of list): killers[ply] contient au plus KILLER_SLOTS coups, le plus récent d'abord.
+        history (list of int): Score d'historique de chaque coup, indexé par `action.code & 0xFFF`
+            (case de départ | case d'arrivée << 6).
+    """
+
+    def __init__(self, max_ply=64):
+        self.killers = [[] for _ in range(max_ply + 1)]
+        self.history = [0] * 4096
+
+    def new_search(self):
+        """
+        Début d'une nouvelle recherche : les coups meurtriers sont oubliés et l'historique est divisé par deux, pour
+        que les coupures récentes comptent plus que celles des coups précédents.
+        """
+        for killers in self.killers:
+            killers.clear()
+        self.history = [score >> 1 for score in self.history]
+
+    def hints(self, ply):
+        """Coups meurtriers du ply donné, à essayer après le coup de la variation principale et celui de la table."""
+        return self.killers[ply]
+
+    def key(self, state):
+        """
+        Renvoie la clé de tri des coups de l'état (plus grande d'abord) : score MVV-LVA des pièces prises pour une
+        capture, score d'historique pour un coup tranquille. Les captures et les coups tranquilles ne sont jamais
+        triés ensemble (voir `FenixState.iter_actions`).
+        """
+        pieces = state.pieces
+        history = self.history
+
+        def key(action):
+            if action.code >> 12:
+                attacker = abs(pieces[action.start])
+                return sum(CAPTURE_SCORES[abs(pieces[position]) * 4 + attacker] for position in action.removed)
+            return history[action.code & 0xFFF]
+
+        return key
+
+    def cutoff(self, move, ply, depth):
+        """Enregistre une coupure bêta causée par `move` au ply donné, avec `depth` demi-coups restants."""
+        if move.code >> 12:
+            return
+        self.history[move.code & 0xFFF] += depth * depth
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
@@ -0,0 +1,130 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from fenix import FenixAction, FenixState
+from transposition import position_key
+
+BOOK_DTYPE = np.dtype([('key', '<u8'), ('move', '<u2')])
+"""
+Format d'une entrée du fichier du livre (10 octets) : clé de la position (`position_key`) et code du coup
+(`FenixAction.code` ; les coups de la phase de placement ne capturent rien et tiennent sur 12 bits).
+"""
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.npy')
+"""Fichier écrit par défaut par le constructeur du livre."""
+
+
+class OpeningBook:
+    """
+    Livre d'ouvertures de la phase de placement (tours 0 à 9).
+
+    Le livre associe la clé d'une position (`position_key`) au coup à y jouer. Sur disque, c'est un tableau NumPy
+    d'entrées `BOOK_DTYPE` triées par clé ; en mémoire, un dictionnaire, pour une recherche en temps constant.
+
+    Attributes:
+        moves (dict): Dictionnaire clé de position -> FenixAction.
+    """
+
+    def __init__(self, moves=None):
+        self.moves = dict(moves or {})
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Charge un livre écrit par `save`."""
+        entries = np.load(path)
+        if entries.dtype != BOOK_DTYPE:
+            raise ValueError(f"{path} is not an opening book")
+        return cls({int(key): FenixAction.from_code(int(move)) for key, move in entries.tolist()})
+
+    def save(self, path=DEFAULT_PATH):
+        """Écrit le livre dans le fichier donné (format NumPy .npy, entrées `BOOK_DTYPE`)."""
+        entries = np.array(sorted((key, move.code) for key, move in self.moves.items()), dtype=BOOK_DTYPE)
+        with open(path, 'wb') as file:
+            np.save(file, entries)
+
+    def lookup(self, state):
+        """Renvoie le coup du livre pour cet état, ou None si l'état n'est pas dans le livre."""
+        if state.turn >= 10:
+            return None
+        return self.moves.get(position_key(state))
+
+    def __len__(self):
+        return len(self.moves)
+
+
+def _search_position(task):
+    # Tâche d'un processus : meilleur coup de la position et coups à développer au tour suivant.
+    from agent import BaseAgent
+
+    state, depth, width = task
+    agent = BaseAgent(state.current_player, search_depth=depth)
+    agent.time_limit = math.inf
+    _, move = agent.alpha_beta(state, depth)
+    ordered = state.iter_actions([move], key=lambda action: agent.heuristique(action, state))
+    return move, [action for _, action in zip(range(width), ordered)]
+
+
+def build_book(plies=6, width=3, depth=3, workers=None, progress=None):
+    """
+    Construit un livre d'ouvertures par recherches profondes depuis la position initiale.
+
+    Chaque position est cherchée à profondeur `depth` et son meilleur coup entre dans le livre. Au tour suivant, on
+    développe ce coup et les `width - 1` coups suivants selon l'heuristique de BaseAgent, pour couvrir les réponses
+    probables de l'adversaire, jusqu'à `plies` tours (au plus 10, fin de la phase de placement). Les positions
+    atteintes par plusieurs ordres de coups ne sont cherchées qu'une fois. Les recherches d'un même tour sont
+    réparties sur `workers` processus (1 : dans le processus courant).
+
+    Args:
+        plies (int): Nombre de tours couverts par le livre.
+        width (int): Nombre de coups développés par position.
+        depth (int): Profondeur des recherches.
+        workers (int, optional): Nombre de processus (par défaut, le nombre de cœurs).
+        progress (callable, optional): Appelé après chaque tour avec (tour, nombre de positions du livre).
+
+    Returns:
+        OpeningBook: Le livre construit.
+    """
+    book = OpeningBook()
+    frontier = [FenixState()]
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+        for ply in range(min(plies, 10)):
+            tasks = [(state, depth, width) for state in frontier]
+            results = pool.map(_search_position, tasks) if pool is not None else list(map(_search_position, tasks))
+            children = dict()
+            for state, (move, expanded) in zip(frontier, results):
+                if move is None:
+                    continue
+                book.moves[position_key(state)] = move
+                for action in expanded:
+                    child = state.result(action)
+                    children.setdefault(position_key(child), child)
+            frontier = [child for key, child in children.items() if key not in book.moves]
+            if progress is not None:
+                progress(ply, len(book))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return book
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Construit le livre d'ouvertures de la phase de placement.")
+    parser.add_argument('--plies', type=int, default=6, help="tours couverts par le livre (au plus 10)")
+    parser.add_argument('--width', type=int, default=3, help="coups développés par position")
+    parser.add_argument('--depth', type=int, default=3, help="profondeur des recherches")
+    parser.add_argument('--workers', type=int, default=None, help="processus (par défaut : nombre de cœurs)")
+    parser.add_argument('--output', default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    book = build_book(args.plies, args.width, args.depth, args.workers,
+                      progress=lambda ply, size: print(f"tour {ply} : {size} positions ({time.perf_counter() - start:.1f} s)"))
+    book.save(args.output)
+    print(f"{len(book)} positions écrites dans {args.output} ({os.path.getsize(args.output)} octets)")
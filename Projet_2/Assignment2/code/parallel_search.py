@@ -0,0 +1,208 @@
+import math
+import multiprocessing
+import os
+import random
+import time
+from agent import BaseAgent, SearchTimeout
+
+_shared_alpha = None
+_worker_agent = None
+
+
+def _init_worker(shared_alpha, tt_size_mb, evaluator, tablebase_directory, options):
+    global _shared_alpha, _worker_agent
+    _shared_alpha = shared_alpha
+    _worker_agent = BaseAgent(1, tt_size_mb=tt_size_mb, evaluator=evaluator, tablebase=tablebase_directory, **options)
+
+
+def _search_root_move(state, move, depth, deadline, generation):
+    """
+    Tâche d'un processus : cherche le coup `move` de la racine à la profondeur donnée, avec comme borne inférieure
+    la meilleure valeur déjà trouvée par les autres processus. Renvoie (coup, valeur, exacte) ou (coup, None, False) si
+    le temps est écoulé ; une valeur non exacte est seulement un majorant (le coup ne bat pas la borne). `deadline` est un instant de time.perf_counter, horloge monotone commune à tous les processus.
+    """
+    agent = _worker_agent
+    agent.time_limit = deadline
+    if agent.player != state.current_player:
+        agent.player = state.current_player
+        if agent.tt is not None:
+            agent.tt.clear()
+    if agent.tt is not None:
+        agent.tt.generation = generation
+    alpha = _shared_alpha.value
+    try:
+        value, _ = agent.alpha_beta(state, depth, alpha=alpha, root_moves=[move])
+    except SearchTimeout:
+        return move, None, False
+    with _shared_alpha.get_lock():
+        if value > _shared_alpha.value:
+            _shared_alpha.value = value
+    return move, value, value > alpha
+
+
+class ParallelBaseAgent(BaseAgent):
+    """
+    BaseAgent dont la recherche est répartie sur plusieurs processus (parallélisme à la racine).
+
+    À chaque itération de l'approfondissement itératif, chaque coup de la racine est cherché par un processus
+    du pool. Les processus partagent la meilleure valeur trouvée à la racine (borne alpha en mémoire partagée),
+    ce qui permet de couper plus tôt les coups moins bons. Chaque processus garde sa propre table de transposition.
+    """
+
+    def __init__(self, player, workers=None, search_depth=None, tt_size_mb=16, evaluator='python', opening_book=None,
+                 tablebase=None, move_ordering='history', engine='pvs', quiescence_budget=64, null_move=False,
+                 late_move_reductions=False, weights=None):
+        """
+        `workers` est le nombre de processus (par défaut, le nombre de cœurs) ; les autres options sont celles de
+        BaseAgent et valent pour la recherche de chaque processus.
+        """
+        super().__init__(player, search_depth=search_depth, tt_size_mb=tt_size_mb, evaluator=evaluator,
+                         opening_book=opening_book, tablebase=tablebase, move_ordering=move_ordering, engine=engine,
+                         quiescence_budget=quiescence_budget, null_move=null_move,
+                         late_move_reductions=late_move_reductions, weights=weights)
+        # Options de recherche transmises aux processus, avec le vecteur de poids déjà chargé.
+        self.search_options = {'move_ordering': move_ordering, 'engine': engine, 'quiescence_budget': quiescence_budget,
+                               'null_move': null_move, 'late_move_reductions': late_move_reductions,
+                               'weights': self.weights}
+        # Les tables de transposition sont dans les processus de recherche.
+        self.tt = None
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_size_mb = tt_size_mb
+        self.pool = None
+        self.shared_alpha = None
+        self.generation = 0
+
+    def _start_pool(self):
+        if self.pool is None:
+            self.shared_alpha = multiprocessing.Value('d', -math.inf)
+            self.pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                             initargs=(self.shared_alpha, self.tt_size_mb, self.evaluator,
+                                                       self.tablebase.directory if self.tablebase else None,
+                                                       self.search_options))
+
+    def ponder(self, state):
+        """
+        Pas de réflexion pendant le temps de l'adversaire : `act` ne reprendrait pas sa recherche, et les processus
+        de recherche occupent déjà les cœurs.
+        """
+
+    def close(self):
+        """Arrête les processus de recherche."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def act(self, state, remaining_time):
+        """Décide du meilleur coup à jouer, en répartissant les coups de la racine sur les processus."""
+        start_time = time.perf_counter()
+        self.stop_pondering()
+        self.predicted_reply = None
+        moves = state.actions()
+
+        if not moves:
+            return None
+        if len(moves) == 1:
+            return moves[0]
+        book_move = self.book_move(state, moves) or self.tablebase_move(state, moves)
+        if book_move is not None:
+            return book_move
+
+        budget = self.allocate_time(state, remaining_time)
+        self.time_limit = start_time + budget
+        self._start_pool()
+
+        chosen_move = None
+        self.last_depth = 0
+        depth = 1
+        while depth <= (self.depth or self.MAX_DEPTH):
+            values = self.search_root(state, moves, depth, self.time_limit, chosen_move)
+            if len(values) == len(moves):
+                chosen_move = max(moves, key=lambda move: values[move])
+                self.last_depth = depth
+            else:
+                # Itération inachevée : on ne change de coup que si un coup a battu l'ancien meilleur à cette profondeur.
+                if chosen_move in values:
+                    chosen_move = max(values, key=values.get)
+                break
+            # Les coups sont triés pour la prochaine itération : meilleurs coups d'abord.
+            moves.sort(key=lambda move: values[move], reverse=True)
+            if time.perf_counter() - start_time > budget / 2:
+                break
+            depth += 1
+
+        if chosen_move in moves:
+            return chosen_move
+
+        return random.choice(moves)
+
+    def search_root(self, state, moves, depth, deadline, first_move=None):
+        """
+        Cherche tous les coups de la racine à la profondeur donnée sur les processus du pool, le coup `first_move`
+        en premier. Renvoie un dictionnaire coup -> (valeur, exacte) des coups dont la recherche s'est terminée avant
+        l'échéance ; à valeur égale, une valeur exacte l'emporte sur un majorant.
+        """
+        self._start_pool()
+        self.shared_alpha.value = -math.inf
+        self.generation += 1
+        ordered = sorted(moves, key=lambda move: move != first_move)
+        tasks = [self.pool.apply_async(_search_root_move, (state, move, depth, deadline, self.generation)) for move in ordered]
+        values = dict()
+        for task in tasks:
+            # Petite marge : le processus lève SearchTimeout lui-même à l'échéance.
+            timeout = None if deadline == math.inf else max(0.0, deadline - time.perf_counter()) + 0.05
+            try:
+                move, value, exact = task.get(timeout=timeout)
+            except multiprocessing.TimeoutError:
+                break
+            if value is None:
+                break
+            values[move] = (value, exact)
+        return values
+
+
+def benchmark(depths=(3, 4, 5), n_positions=3, workers=None, seed=0):
+    """
+    Compare le temps de la recherche alpha-bêta séquentielle et de la recherche parallèle à profondeur fixe,
+    sur des positions de milieu de partie obtenues par des coups aléatoires. Renvoie une liste de
+    (profondeur, temps séquentiel, temps parallèle, accélération).
+    """
+    import fenix
+
+    random.seed(seed)
+    positions = []
+    while len(positions) < n_positions:
+        state = fenix.FenixState()
+        for _ in range(random.randrange(12, 24)):
+            if state.is_terminal():
+                break
+            state = state.result(random.choice(state.actions()))
+        if not state.is_terminal():
+            positions.append(state)
+
+    results = []
+    parallel = ParallelBaseAgent(1, workers=workers, tt_size_mb=0)
+    try:
+        for depth in depths:
+            serial_time = parallel_time = 0.0
+            for state in positions:
+                serial = BaseAgent(state.current_player, tt_size_mb=0)
+                serial.time_limit = math.inf
+                start = time.perf_counter()
+                serial.alpha_beta(state, depth)
+                serial_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                parallel.search_root(state, state.actions(), depth, math.inf)
+                parallel_time += time.perf_counter() - start
+            results.append((depth, serial_time, parallel_time, serial_time / parallel_time))
+    finally:
+        parallel.close()
+    return results
+
+
+if __name__ == '__main__':
+    print(f"{os.cpu_count()} core(s)")
+    print(f"{'depth':>5} {'serial (s)':>11} {'parallel (s)':>13} {'speedup':>8}")
+    for depth, serial_time, parallel_time, speedup in benchmark():
+        print(f"{depth:>5} {serial_time:>11.2f} {parallel_time:>13.2f} {speedup:>8.2f}")
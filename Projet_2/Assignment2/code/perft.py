@@ -0,0 +1,306 @@
+import argparse
+import math
+import random
+import sys
+import time
+
+from fenix import FenixState
+from fenix_bitboard import BitboardFenixState
+
+_SYMBOLS = {0: '.', 1: 's', 2: 'g', 3: 'k', -1: 'S', -2: 'G', -3: 'K'}
+_VALUES = {symbol: value for value, symbol in _SYMBOLS.items()}
+
+
+def encode(state):
+    """
+    Encodes a state as a text line: the 56 squares row by row (`.` empty, `s`/`g`/`k` for player 1, `S`/`G`/`K`
+    for player -1), the player to move, the turn and the can_create_general/can_create_king flags (0 or 1).
+    The repetition history and the boring turn counter are not encoded.
+
+    Args:
+        state (FenixState): The state to encode.
+
+    Returns:
+        str: The encoded state.
+    """
+    board = ''.join(_SYMBOLS[state.pieces.get((i, j), 0)] for i in range(state.dim[0]) for j in range(state.dim[1]))
+    return f"{board} {state.current_player} {state.turn} {int(state.can_create_general)}{int(state.can_create_king)}"
+
+
+def decode(text):
+    """
+    Decodes a state encoded with `encode`.
+
+    Args:
+        text (str): The encoded state.
+
+    Returns:
+        FenixState: The decoded state, with an empty repetition history.
+    """
+    board, player, turn, flags = text.split()
+    state = FenixState()
+    state.pieces = {(square // state.dim[1], square % state.dim[1]): _VALUES[symbol]
+                    for square, symbol in enumerate(board) if symbol != '.'}
+    state.piece_counts = state._count_pieces()
+    state.current_player = int(player)
+    state.turn = int(turn)
+    state.can_create_general = flags[0] == '1'
+    state.can_create_king = flags[1] == '1'
+    state.precomputed_hash = state._zobrist()
+    return state
+
+
+POSITIONS = {
+    'initial': encode(FenixState()),
+    'setup': 's.gsg...gssss..S..ss..SSsgs..G.Sss..SSSSs....GSS..SGG.SS 1 8 00',
+    'opening': 's.gsg...g.sss..S.sss...Ssk...GSSs...SSSSss...GSS...KG.SS -1 13 00',
+    'middlegame': '.sss.G..gs..s..S.s.....Kkss...S..s.g.SSSS...g..G..SS.GS. -1 31 00',
+    'captures': '.kssss..g.s.g.S.s..s..SG.s......ss..S.G.g..SSKSS.S..S.G. 1 20 00',
+    'kings': 's...g.Sgss.ss....gk..S.Ssss...SSss..S.K..s.SSS.G..SSS.G. 1 18 00',
+}
+"""Saved positions used by the perft suite, encoded with `encode`."""
+
+CAPTURE_POSITIONS = {
+    'king lattice': 'k........S.S.S.S.........S.S.S.S.........S.S.S.S.......K 1 20 00',
+    'generals lattice': 'g.g......S.S.S.Sg.g......S.S.S.S.........S.S.S.Sk.....K. 1 20 00',
+    'king and generals': 'k.g......S.S.S.Sg...g....S.S.S.S..G......S.S.S.S......K. 1 20 00',
+}
+"""
+Capture-heavy positions, where many capture orders lead to the same chain, used to benchmark and check
+`_max_actions`.
+"""
+
+REFERENCE_COUNTS = {
+    'initial': {1: 60, 2: 3600, 3: 185400, 4: 9548100},
+    'setup': {1: 9, 2: 36, 3: 848, 4: 20329},
+    'opening': {1: 24, 2: 457, 3: 8479, 4: 164084},
+    'middlegame': {1: 3, 2: 3, 3: 35, 4: 426},
+    'captures': {1: 2, 2: 42, 3: 79, 4: 746},
+    'kings': {1: 2, 2: 28, 3: 693, 4: 7411},
+}
+"""
+Reference perft counts (number of leaf nodes at each depth) of the saved positions, computed with the original move
+generator. Any change to the move generator that alters these counts changes which moves are legal.
+"""
+
+AGENT_OPTIONS = (
+    {'quiescence_budget': 0},
+    {},
+    {'null_move': True, 'late_move_reductions': True},
+)
+"""`BaseAgent` options searched by `check_agent` on the bitboard state."""
+
+
+def perft(state, depth):
+    """
+    Counts the leaf nodes of the game tree to a given depth, walking a single state with `apply` and `undo`.
+    Every distinct legal action counts once; the tree is not cut at terminal states.
+
+    Args:
+        state (FenixState): The root state (restored on return).
+        depth (int): The depth of the tree.
+
+    Returns:
+        int: The number of leaf nodes.
+    """
+    if depth == 0:
+        return 1
+    actions = set(state.actions())
+    if depth == 1:
+        return len(actions)
+    nodes = 0
+    for action in actions:
+        state.apply(action)
+        nodes += perft(state, depth - 1)
+        state.undo()
+    return nodes
+
+
+def perft_result(state, depth):
+    """
+    Same as `perft`, but creates one state per node with `result`.
+    """
+    if depth == 0:
+        return 1
+    actions = set(state.actions())
+    if depth == 1:
+        return len(actions)
+    return sum(perft_result(state.result(action), depth - 1) for action in actions)
+
+
+def _same_state(first, second):
+    return (first.pieces == second.pieces and first.turn == second.turn and
+            first.current_player == second.current_player and
+            first.can_create_general == second.can_create_general and
+            first.can_create_king == second.can_create_king and
+            first.boring_turn == second.boring_turn and
+            first.repetition_counts == second.repetition_counts and
+            first._hash() == second._hash())
+
+
+def check_perft(max_depth=3):
+    """
+    Compares the perft counts of the saved positions with the reference counts, for `FenixState` with
+    `apply`/`undo`, `FenixState` with `result` and `BitboardFenixState`, and the actions of the capture-heavy
+    positions with those of `BitboardFenixState`.
+
+    Returns:
+        list of str: A description of each mismatch.
+    """
+    failures = []
+    for name, text in CAPTURE_POSITIONS.items():
+        state = decode(text)
+        if set(state.actions()) != set(BitboardFenixState.from_state(state).actions()):
+            failures.append(f"actions {name}: bitboard actions differ")
+    for name, text in POSITIONS.items():
+        for depth, expected in REFERENCE_COUNTS[name].items():
+            if depth > max_depth:
+                continue
+            for label, count in (('apply/undo', perft(decode(text), depth)),
+                                 ('result', perft_result(decode(text), depth)),
+                                 ('bitboard', perft(BitboardFenixState.from_state(decode(text)), depth))):
+                if count != expected:
+                    failures.append(f"perft {name} depth {depth} ({label}): {count} nodes, expected {expected}")
+    return failures
+
+
+def check_playouts(n_games=50, seed=0):
+    """
+    Plays random games and checks, at every position, that:
+    - `apply` gives the same successor as `result` and `undo` restores the parent, for both state classes;
+    - the incremental hash and piece counters match a recomputation from scratch;
+    - `iter_actions` yields exactly the actions of `actions()`, each once, and their tuples hash like them;
+    - `BitboardFenixState` generates the same actions and has the same piece counters and capture test.
+
+    Returns:
+        list of str: A description of each mismatch.
+    """
+    failures = []
+    rng = random.Random(seed)
+    for game in range(n_games):
+        state = FenixState()
+        walker = FenixState()
+        bitboard_walker = BitboardFenixState()
+        while not state.is_terminal() and len(failures) < 10:
+            actions = state.actions()
+            where = f"game {game} turn {state.turn}"
+            if state._hash() != state._zobrist() or state.piece_counts != state._count_pieces():
+                failures.append(f"{where}: incremental hash or piece counters out of date")
+            if any(action.to_namedtuple() not in set(actions) for action in actions):
+                failures.append(f"{where}: an action tuple is not found in the set of actions")
+            yielded = list(state.iter_actions(hints=[rng.choice(actions)]))
+            if len(yielded) != len(set(yielded)) or set(yielded) != set(actions):
+                failures.append(f"{where}: iter_actions differs from actions")
+            bitboard_state = BitboardFenixState.from_state(state)
+            if set(bitboard_state.actions()) != set(actions):
+                failures.append(f"{where}: bitboard actions differ")
+            if (bitboard_state.piece_counts != state.piece_counts or
+                    bitboard_state._has_capture() != state._has_capture()):
+                failures.append(f"{where}: bitboard piece counters or capture test differ")
+            for action in set(actions):
+                walker.apply(action)
+                if not _same_state(walker, state.result(action)):
+                    failures.append(f"{where}: apply({action}) differs from result")
+                walker.undo()
+                if not _same_state(walker, state):
+                    failures.append(f"{where}: undo after {action} does not restore the state")
+                bitboard_walker.apply(action)
+                if not _same_state(bitboard_walker, walker.result(action)):
+                    failures.append(f"{where}: bitboard apply({action}) differs from result")
+                bitboard_walker.undo()
+                if not _same_state(bitboard_walker, state):
+                    failures.append(f"{where}: bitboard undo after {action} does not restore the state")
+            action = rng.choice(actions)
+            state = state.result(action)
+            walker.apply(action)
+            bitboard_walker.apply(action)
+    return failures
+
+
+def check_agent(depth=2):
+    """
+    Runs a short `BaseAgent.act` search on the `BitboardFenixState` version of each saved position, so that the
+    search cannot come to rely on a member that only `FenixState` has.
+
+    Returns:
+        list of str: A description of each failure.
+    """
+    from agent import BaseAgent
+
+    failures = []
+    for name, text in POSITIONS.items():
+        for options in AGENT_OPTIONS:
+            state = BitboardFenixState.from_state(decode(text))
+            agent = BaseAgent(state.current_player, search_depth=depth, tt_size_mb=1, **options)
+            try:
+                action = agent.act(state, math.inf)
+            except Exception as error:
+                failures.append(f"agent {name} {options}: {type(error).__name__}: {error}")
+                continue
+            if action not in state.actions() or state.undo_stack:
+                failures.append(f"agent {name} {options}: illegal action or state not restored")
+    return failures
+
+
+def _rate(function, arguments, min_time=0.2):
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for argument in arguments:
+            function(argument)
+        calls += len(arguments)
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def benchmark(min_time=0.2):
+    """
+    Measures the speed of the main `FenixState` operations on the saved positions and their successors.
+
+    Returns:
+        dict: Calls per second for `_setup_actions`, `_max_actions`, `result`, `_zobrist` and `is_terminal`, calls
+        per second of `_max_actions` on each capture-heavy position, and nodes per second of `perft` at depth 3 on
+        each saved position.
+    """
+    states = [decode(text) for text in POSITIONS.values()]
+    children = [state.result(action) for state in states for action in set(state.actions())]
+    setup = [state for state in states + children if state.turn < 10]
+    playing = [state for state in states + children if state.turn >= 10]
+    moves = [(state, action) for state in states for action in state.actions()]
+
+    rates = {
+        '_setup_actions': _rate(lambda state: state._setup_actions(), setup, min_time),
+        '_max_actions': _rate(lambda state: state._max_actions(), playing, min_time),
+        'result': _rate(lambda move: move[0].result(move[1]), moves, min_time),
+        '_zobrist': _rate(lambda state: state._zobrist(), children, min_time),
+        'is_terminal': _rate(lambda state: state.is_terminal(), children, min_time),
+    }
+    for name, text in CAPTURE_POSITIONS.items():
+        rates[f"_max_actions({name})"] = _rate(lambda state: state._max_actions(), [decode(text)], min_time)
+    for name, text in POSITIONS.items():
+        state = decode(text)
+        start = time.perf_counter()
+        nodes = perft(state, 3)
+        rates[f"perft({name}, 3)"] = nodes / (time.perf_counter() - start)
+    return rates
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Perft benchmark and move generation correctness suite.")
+    parser.add_argument('--depth', type=int, default=3, help="maximum perft depth checked against the references")
+    parser.add_argument('--games', type=int, default=50, help="random games of the playout checks")
+    parser.add_argument('--no-check', action='store_true', help="only run the benchmark")
+    parser.add_argument('--no-bench', action='store_true', help="only run the correctness checks")
+    args = parser.parse_args()
+
+    failures = []
+    if not args.no_check:
+        failures = check_perft(args.depth) + check_playouts(args.games) + check_agent()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print(f"correctness: {'OK' if not failures else f'{len(failures)} failure(s)'}")
+    if not args.no_bench:
+        for name, rate in benchmark().items():
+            print(f"{name:<32} {rate:>12,.0f} /s")
+    sys.exit(1 if failures else 0)
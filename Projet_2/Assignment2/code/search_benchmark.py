@@ -0,0 +1,109 @@
+import argparse
+import math
+import random
+import time
+from copy import deepcopy
+
+from agent import BaseAgent
+from fenix import FenixState
+from perft import POSITIONS, decode
+
+CONFIGURATIONS = {
+    'minimax, heuristique ordering': {'engine': 'minimax', 'move_ordering': 'heuristique', 'quiescence_budget': 0},
+    'minimax, killers + history': {'engine': 'minimax', 'move_ordering': 'history', 'quiescence_budget': 0},
+    'pvs + aspiration': {'engine': 'pvs', 'quiescence_budget': 0},
+    'pvs + quiescence': {'engine': 'pvs'},
+    'pvs + quiescence + null move': {'engine': 'pvs', 'null_move': True},
+    'pvs + quiescence + null move + LMR': {'engine': 'pvs', 'null_move': True, 'late_move_reductions': True},
+}
+"""Configurations de BaseAgent comparées par défaut (arguments donnés au constructeur)."""
+
+
+def benchmark_positions(n_random=4, seed=0):
+    """
+    Positions du banc d'essai : les positions enregistrées de la suite perft (sauf la position initiale) et
+    `n_random` positions de milieu de partie obtenues par des coups aléatoires.
+    """
+    positions = [decode(text) for name, text in POSITIONS.items() if name != 'initial']
+    rng = random.Random(seed)
+    while len(positions) < len(POSITIONS) - 1 + n_random:
+        state = FenixState()
+        for _ in range(rng.randrange(12, 30)):
+            if state.is_terminal():
+                break
+            state = state.result(rng.choice(state.actions()))
+        if not state.is_terminal():
+            positions.append(state)
+    return positions
+
+
+def search_statistics(kwargs, positions, depth):
+    """
+    Cherche chaque position par approfondissement itératif (`BaseAgent.act`) jusqu'à la profondeur donnée avec un
+    BaseAgent construit avec `kwargs`, sans limite de temps ni table de transposition partagée entre positions.
+
+    Returns:
+        dict: Nœuds visités (dont ceux de la quiescence), coupures, taux de coupure au premier coup et temps total.
+    """
+    nodes = qnodes = cutoffs = first_move_cutoffs = 0
+    elapsed = 0.0
+    for state in positions:
+        agent = BaseAgent(state.current_player, search_depth=depth, **kwargs)
+        start = time.perf_counter()
+        # Copie : apply/undo changent l'ordre des pièces dans le dictionnaire, donc l'ordre des coups à égalité.
+        agent.act(deepcopy(state), math.inf)
+        elapsed += time.perf_counter() - start
+        nodes += agent.nodes
+        qnodes += agent.qnodes
+        cutoffs += agent.cutoffs
+        first_move_cutoffs += agent.first_move_cutoffs
+    return {'nodes': nodes, 'qnodes': qnodes, 'cutoffs': cutoffs,
+            'first_move_rate': first_move_cutoffs / max(1, cutoffs), 'time': elapsed}
+
+
+def depth_reached(kwargs, positions, seconds):
+    """
+    Cherche chaque position pendant `seconds` secondes avec un BaseAgent construit avec `kwargs` et renvoie la
+    profondeur médiane de la dernière itération terminée.
+    """
+    depths = []
+    for state in positions:
+        agent = BaseAgent(state.current_player, **kwargs)
+        agent.allocate_time = lambda _, remaining_time: seconds
+        agent.act(deepcopy(state), math.inf)
+        depths.append(agent.last_depth)
+    return sorted(depths)[len(depths) // 2]
+
+
+def benchmark(configurations=CONFIGURATIONS, depth=4, n_random=4, seed=0, seconds=None):
+    """
+    Compare les configurations de BaseAgent sur les mêmes positions, à profondeur fixe.
+
+    Returns:
+        dict: Statistiques de `search_statistics` pour chaque configuration, avec la profondeur médiane atteinte
+        en `seconds` secondes par position (`depth_reached`) si `seconds` est donné.
+    """
+    positions = benchmark_positions(n_random, seed)
+    results = dict()
+    for name, kwargs in configurations.items():
+        results[name] = search_statistics(kwargs, positions, depth)
+        if seconds is not None:
+            results[name]['depth_reached'] = depth_reached(kwargs, positions, seconds)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare le nombre de nœuds cherchés par BaseAgent selon sa configuration.")
+    parser.add_argument('--depth', type=int, default=4, help="profondeur de la recherche")
+    parser.add_argument('--random', type=int, default=4, help="positions aléatoires ajoutées aux positions perft")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time', type=float, default=None,
+                        help="mesure aussi la profondeur médiane atteinte avec ce temps par position (s)")
+    args = parser.parse_args()
+
+    print(f"{'configuration':<36} {'nodes':>10} {'qnodes':>10} {'cutoffs':>9} {'1st move':>9} {'time (s)':>9}"
+          + (f" {'depth':>6}" if args.time is not None else ""))
+    for name, stats in benchmark(depth=args.depth, n_random=args.random, seed=args.seed, seconds=args.time).items():
+        print(f"{name:<36} {stats['nodes']:>10,} {stats['qnodes']:>10,} {stats['cutoffs']:>9,} "
+              f"{stats['first_move_rate']:>8.1%} {stats['time']:>9.2f}"
+              + (f" {stats['depth_reached']:>6}" if args.time is not None else ""))
@@ -0,0 +1,144 @@
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+from copy import deepcopy
+
+import numpy as np
+
+from fenix import FenixState
+
+RECORD_DTYPE = np.dtype([
+    ('board', 'i1', 56),
+    ('player', 'i1'),
+    ('turn', '<u2'),
+    ('flags', 'u1'),
+    ('boring_turn', 'u1'),
+    ('move_squares', '<u2'),
+    ('move_removed', '<u8'),
+    ('score', '<f4'),
+    ('depth', 'u1'),
+    ('result', 'i1'),
+    ('game', '<u4'),
+])
+"""
+Format d'un enregistrement (une position jouée, 81 octets, sans alignement) :
+
+- `board` : les 56 cases ligne par ligne (valeur de la pièce, 0 si vide), comme `FenixState._flatten` ;
+- `player`, `turn`, `boring_turn` : joueur au trait, tour et compteur de tours sans prise ;
+- `flags` : can_create_general (bit 0) et can_create_king (bit 1) ;
+- `move_squares`, `move_removed` : coup joué, cases (départ | arrivée << 6) et masque des cases prises
+  (`FenixAction.code` vaut move_squares | move_removed << 12) ;
+- `score`, `depth` : valeur de la recherche pour le joueur au trait et profondeur atteinte (NaN et 0 sans
+  recherche : coup unique, livre d'ouvertures ou coup aléatoire) ;
+- `result` : résultat final de la partie pour le joueur au trait (1, 0 ou -1) ;
+- `game` : numéro de la partie (sa graine).
+
+Les fichiers sont une suite d'enregistrements sans en-tête : on y ajoute des parties à la fin et on les lit avec
+`load_records` (numpy.memmap).
+"""
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'self_play.bin')
+"""Fichier écrit par défaut par le générateur."""
+
+
+def load_records(path=DEFAULT_PATH):
+    """Ouvre un fichier d'enregistrements en lecture seule, sans copie (numpy.memmap de RECORD_DTYPE)."""
+    if os.path.getsize(path) % RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a self-play file (size is not a multiple of {RECORD_DTYPE.itemsize})")
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r')
+
+
+def play_game(seed, depth=2, random_plies=4, agent_kwargs=None):
+    """
+    Joue une partie de BaseAgent contre lui-même à profondeur fixe, après `random_plies` demi-coups aléatoires
+    pour varier les parties.
+
+    Returns:
+        np.ndarray: Un enregistrement RECORD_DTYPE par position jouée.
+    """
+    from agent import BaseAgent
+
+    random.seed(seed)
+    kwargs = dict(agent_kwargs or {}, search_depth=depth)
+    agents = {1: BaseAgent(1, **kwargs), -1: BaseAgent(-1, **kwargs)}
+    state = FenixState()
+    records = []
+    while not state.is_terminal():
+        moves = state.actions()
+        if not moves:
+            break
+        agent = agents[state.current_player]
+        if state.turn < random_plies:
+            move, score, reached = random.choice(moves), math.nan, 0
+        else:
+            move = agent.act(deepcopy(state), math.inf)
+            score = math.nan if agent.last_value is None else agent.last_value
+            reached = agent.last_depth if agent.last_value is not None else 0
+        records.append((state._flatten(), state.current_player, state.turn,
+                        state.can_create_general | state.can_create_king << 1, min(state.boring_turn, 255),
+                        move.code & 0xFFF, move.code >> 12, score, reached, 0, seed))
+        state = state.result(move)
+
+    # Sans coup légal, le joueur au trait perd, comme dans TextGameManager.
+    winner = state.utility(1) if state.is_terminal() else -state.current_player
+    records = np.array(records, dtype=RECORD_DTYPE)
+    records['result'] = winner * records['player']
+    return records
+
+
+def _play_game(task):
+    return play_game(*task)
+
+
+def generate(path=DEFAULT_PATH, n_games=100, depth=2, random_plies=4, workers=None, seed=0, progress=None):
+    """
+    Joue `n_games` parties sur `workers` processus (1 : dans le processus courant) et ajoute leurs positions à la
+    fin du fichier au fur et à mesure que les parties se terminent. La partie i utilise la graine seed + i.
+
+    Args:
+        progress (callable, optional): Appelé après chaque partie avec (parties écrites, positions écrites).
+
+    Returns:
+        int: Nombre de positions écrites.
+    """
+    tasks = [(seed + game, depth, random_plies) for game in range(n_games)]
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    games = positions = 0
+    try:
+        outcomes = pool.imap_unordered(_play_game, tasks) if pool is not None else map(_play_game, tasks)
+        with open(path, 'ab') as file:
+            for records in outcomes:
+                records.tofile(file)
+                file.flush()
+                games += 1
+                positions += len(records)
+                if progress is not None:
+                    progress(games, positions)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return positions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Génère des parties de BaseAgent contre lui-même au format binaire.")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--depth', type=int, default=2, help="profondeur des recherches")
+    parser.add_argument('--random-plies', type=int, default=4, help="demi-coups aléatoires en début de partie")
+    parser.add_argument('--workers', type=int, default=None, help="processus (par défaut : nombre de cœurs)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate(args.output, args.games, args.depth, args.random_plies, args.workers, args.seed,
+             progress=lambda games, positions: print(f"{games} parties, {positions} positions "
+                                                     f"({time.perf_counter() - start:.1f} s)"))
+    records = load_records(args.output)
+    print(f"{args.output} : {len(records)} positions, {os.path.getsize(args.output)} octets")
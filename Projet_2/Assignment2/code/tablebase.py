@@ -0,0 +1,359 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from math import comb
+
+import numpy as np
+
+from fenix import FenixState
+
+WIN, DRAW, LOSS = 1, 0, -1
+"""Résultat d'une position pour le joueur qui a le trait."""
+
+SQUARES = 56
+"""Nombre de cases du plateau ; la case d'une position (ligne, colonne) est ligne * 8 + colonne."""
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebases')
+"""Dossier des tables par défaut."""
+
+_SYMBOLS = {1: 's', 2: 'g', 3: 'k', -1: 'S', -2: 'G', -3: 'K'}
+_VALUES = {symbol: value for value, symbol in _SYMBOLS.items()}
+_POSITIONS = [(square // 8, square % 8) for square in range(SQUARES)]
+
+
+def signatures(max_pieces):
+    """
+    Renvoie les signatures matérielles des tables jusqu'à `max_pieces` pièces : un roi par camp, plus des soldats
+    et des généraux. Une signature est le tuple trié des valeurs des pièces.
+    """
+    result = []
+    for extra in range(max_pieces - 1):
+        for pieces in itertools.combinations_with_replacement((-2, -1, 1, 2), extra):
+            result.append(tuple(sorted(pieces + (-3, 3))))
+    return result
+
+
+def signature_name(signature):
+    """Nom de fichier d'une signature : une lettre par pièce, minuscule pour le joueur 1 (par exemple « Kks »)."""
+    return ''.join(_SYMBOLS[value] for value in signature)
+
+
+class Layout:
+    """
+    Indexation compacte des positions d'une signature.
+
+    Les pièces de même valeur forment un groupe dont les cases sont rangées par le système combinatoire
+    (C(56, n) rangs pour n pièces identiques). L'index d'une position combine les rangs des groupes, le joueur qui a
+    le trait et, si la signature permet d'empiler deux soldats, le drapeau can_create_general. Les index dont deux
+    groupes partagent une case ne correspondent à aucune position.
+
+    Attributes:
+        signature (tuple): La signature matérielle.
+        groups (list of tuple): Les (valeur, nombre de pièces) de chaque groupe.
+        flag (bool): Si l'index contient le drapeau can_create_general.
+        size (int): Le nombre d'index.
+    """
+
+    def __init__(self, signature):
+        self.signature = tuple(signature)
+        self.groups = [(value, self.signature.count(value)) for value in sorted(set(self.signature))]
+        self.flag = self.signature.count(1) >= 2 or self.signature.count(-1) >= 2
+        self.placements = 1
+        for _, count in self.groups:
+            self.placements *= comb(SQUARES, count)
+        self.size = self.placements * 2 * (2 if self.flag else 1)
+
+    def index(self, pieces, player, can_create_general=False):
+        """Index de la position donnée par son dictionnaire de pièces, le joueur qui a le trait et le drapeau."""
+        squares = {value: [] for value, _ in self.groups}
+        for (i, j), value in pieces.items():
+            squares[value].append(i * 8 + j)
+        placement = 0
+        for value, count in self.groups:
+            rank = sum(comb(square, k + 1) for k, square in enumerate(sorted(squares[value])))
+            placement = placement * comb(SQUARES, count) + rank
+        index = placement * 2 + (player == -1)
+        if self.flag:
+            index = index * 2 + bool(can_create_general)
+        return index
+
+    def position(self, index):
+        """Inverse de `index` : renvoie (pièces, joueur, drapeau), ou None si deux pièces partagent une case."""
+        can_create_general = False
+        if self.flag:
+            index, can_create_general = divmod(index, 2)
+        placement, black = divmod(index, 2)
+        pieces = dict()
+        for value, count in reversed(self.groups):
+            placement, rank = divmod(placement, comb(SQUARES, count))
+            for k in range(count, 0, -1):
+                square = k - 1
+                while comb(square + 1, k) <= rank:
+                    square += 1
+                rank -= comb(square, k)
+                position = _POSITIONS[square]
+                if position in pieces:
+                    return None
+                pieces[position] = value
+        return pieces, -1 if black else 1, bool(can_create_general)
+
+
+def _paths(directory, signature):
+    name = signature_name(signature)
+    return os.path.join(directory, f"{name}.wdl.npy"), os.path.join(directory, f"{name}.dtm.npy")
+
+
+class Tablebase:
+    """
+    Tables de finales calculées par `generate`, ouvertes en mémoire partagée (numpy.memmap) à la première sonde.
+
+    Pour chaque signature, le fichier WDL (int8) donne le résultat de chaque position pour le joueur qui a le trait et
+    le fichier DTM (uint16) le nombre de demi-coups avant la fin de partie avec un jeu optimal (gagner au plus vite,
+    perdre au plus tard). Les tables ignorent le compteur de tours sans prise et l'historique des répétitions.
+
+    Attributes:
+        directory (str): Le dossier des tables.
+        max_pieces (int): Le nombre de pièces des plus grandes tables présentes.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        self.directory = directory
+        self.tables = dict()
+        self.max_pieces = 0
+        if os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                if file_name.endswith('.wdl.npy'):
+                    self.max_pieces = max(self.max_pieces, len(file_name) - len('.wdl.npy'))
+
+    def _table(self, signature):
+        if signature not in self.tables:
+            wdl_path, dtm_path = _paths(self.directory, signature)
+            if os.path.exists(wdl_path) and os.path.exists(dtm_path):
+                self.tables[signature] = (Layout(signature), np.load(wdl_path, mmap_mode='r'),
+                                          np.load(dtm_path, mmap_mode='r'))
+            else:
+                self.tables[signature] = None
+        return self.tables[signature]
+
+    def probe(self, state):
+        """
+        Sonde les tables pour l'état donné, sans tenir compte de la règle des 50 tours.
+
+        Returns:
+            tuple or None: (WIN, DRAW ou LOSS pour le joueur qui a le trait, nombre de demi-coups avant la fin), ou
+            None si la position n'est pas couverte (phase de placement, matériel absent des tables).
+        """
+        if state.turn <= 10 or len(state.pieces) > self.max_pieces or state.can_create_king:
+            return None
+        table = self._table(tuple(sorted(state.pieces.values())))
+        if table is None:
+            return None
+        layout, wdl, dtm = table
+        # Sans deux soldats d'un même camp, le drapeau ne change aucun coup : la table ne le distingue pas.
+        index = layout.index(state.pieces, state.current_player, state.can_create_general)
+        return int(wdl[index]), int(dtm[index])
+
+    def probe_game(self, state):
+        """
+        Comme `probe`, mais ne renvoie que les résultats garantis par les règles de la partie : un gain ou une perte
+        n'est sûr que s'il arrive avant que le compteur de tours sans prise n'atteigne 50.
+        """
+        result = self.probe(state)
+        if result is None or result[0] == DRAW or state.boring_turn + result[1] < 50:
+            return result
+        return None
+
+
+def _better(first, second):
+    # Compare deux résultats (wdl, dtm) pour le joueur qui choisit : gagner vite, sinon nulle, sinon perdre tard.
+    if second is None:
+        return True
+    if first[0] != second[0]:
+        return first[0] > second[0]
+    return first[1] < second[1] if first[0] == WIN else first[1] > second[1] if first[0] == LOSS else False
+
+
+def _resolve(state, tablebase, depth=3):
+    # Valeur exacte d'une position hors des tables en cours de calcul : tables plus petites, fin de partie ou
+    # recherche exhaustive courte (une prise de roi finit la partie en au plus deux demi-coups). None si inconnue.
+    if state.is_terminal():
+        return state.utility(state.current_player), 0
+    result = tablebase.probe(state)
+    if result is not None:
+        return result
+    moves = state.actions()
+    if not moves:
+        # Un joueur sans coup ne peut rien jouer : le gestionnaire de partie le déclare perdant.
+        return LOSS, 0
+    if depth == 0:
+        return None
+    best = None
+    unknown = False
+    for move in moves:
+        state.apply(move)
+        child = _resolve(state, tablebase, depth - 1)
+        state.undo()
+        if child is None:
+            unknown = True
+            continue
+        value = (-child[0], child[1] + 1)
+        if _better(value, best):
+            best = value
+    if unknown and (best is None or best[0] != WIN):
+        return None
+    return best
+
+
+def generate_table(signature, directory=DEFAULT_DIRECTORY):
+    """
+    Calcule la table d'une signature par analyse rétrograde et l'écrit dans le dossier donné. Les tables des
+    signatures à moins de pièces doivent déjà y être.
+
+    Chaque position est d'abord développée une fois : ses coups qui restent dans la signature sont gardés comme
+    arêtes, ceux qui capturent ou empilent sont évalués par les tables plus petites. Les positions sont ensuite
+    résolues par tours successifs, tous les calculs d'un tour étant vectorisés : au tour k, une position est gagnée en
+    k demi-coups si un coup mène à une position perdue en k - 1, et perdue en k si tous ses coups mènent à des positions
+    gagnées pour l'adversaire en au plus k - 1. Les positions jamais résolues sont nulles.
+
+    Returns:
+        dict: Statistiques de la table (nombre de positions gagnées, nulles, perdues, DTM maximal, durée).
+    """
+    start_time = time.perf_counter()
+    layout = Layout(signature)
+    smaller = Tablebase(directory)
+    smaller.max_pieces = len(signature) - 1
+
+    n = layout.size
+    wdl = np.zeros(n, dtype=np.int8)
+    dtm = np.zeros(n, dtype=np.int32)
+    valid = np.zeros(n, dtype=bool)
+    resolved = np.zeros(n, dtype=bool)
+    unbounded = 2**30
+    ext_win = np.full(n, unbounded, dtype=np.int32)
+    ext_draw = np.zeros(n, dtype=bool)
+    ext_loss = np.zeros(n, dtype=np.int32)
+    sources, targets = [], []
+
+    state = FenixState()
+    state.turn = 20
+    for index in range(n):
+        position = layout.position(index)
+        if position is None:
+            continue
+        pieces, player, can_create_general = position
+        valid[index] = True
+        state.pieces = pieces
+        state.piece_counts = state._count_pieces()
+        state.current_player = player
+        state.can_create_general = can_create_general
+        state.precomputed_hash = None
+        if state.is_terminal():
+            wdl[index] = state.utility(player)
+            resolved[index] = True
+            continue
+        moves = state.actions()
+        if not moves:
+            wdl[index] = LOSS
+            resolved[index] = True
+            continue
+        for move in moves:
+            state.apply(move)
+            if len(move.removed) == 0 and len(state.pieces) == len(signature):
+                sources.append(index)
+                targets.append(layout.index(state.pieces, state.current_player))
+            else:
+                child = _resolve(state, smaller)
+                if child is None or child[0] == DRAW:
+                    ext_draw[index] = True
+                elif child[0] == LOSS:
+                    ext_win[index] = min(ext_win[index], child[1] + 1)
+                else:
+                    ext_loss[index] = max(ext_loss[index], child[1] + 1)
+            state.undo()
+
+    sources = np.array(sources, dtype=np.int64)
+    targets = np.array(targets, dtype=np.int64)
+    last_external = int(max(ext_loss.max(initial=0), ext_win[ext_win < unbounded].max(initial=0)))
+    k = 1
+    while True:
+        child_resolved = resolved[targets]
+        child_wdl = wdl[targets]
+        win = np.zeros(n, dtype=bool)
+        win[sources[child_resolved & (child_wdl == LOSS) & (dtm[targets] == k - 1)]] = True
+        win |= ext_win == k
+        win &= valid & ~resolved
+        blocked = np.zeros(n, dtype=bool)
+        blocked[sources[~(child_resolved & (child_wdl == WIN))]] = True
+        loss = valid & ~resolved & ~win & ~blocked & ~ext_draw & (ext_win == unbounded) & (ext_loss <= k)
+        wdl[win] = WIN
+        wdl[loss] = LOSS
+        dtm[win | loss] = k
+        resolved |= win | loss
+        if not (win.any() or loss.any()) and k > last_external:
+            break
+        k += 1
+
+    os.makedirs(directory, exist_ok=True)
+    wdl_path, dtm_path = _paths(directory, signature)
+    np.save(wdl_path, wdl)
+    np.save(dtm_path, np.minimum(dtm, np.iinfo(np.uint16).max).astype(np.uint16))
+    return {
+        'signature': signature_name(signature),
+        'positions': int(valid.sum()),
+        'wins': int((valid & (wdl == WIN)).sum()),
+        'draws': int((valid & (wdl == DRAW)).sum()),
+        'losses': int((valid & (wdl == LOSS)).sum()),
+        'max_dtm': int(dtm.max(initial=0)),
+        'time': time.perf_counter() - start_time,
+    }
+
+
+def _generate_table(task):
+    return generate_table(*task)
+
+
+def generate(max_pieces=3, directory=DEFAULT_DIRECTORY, workers=None, progress=None):
+    """
+    Calcule toutes les tables jusqu'à `max_pieces` pièces. Les signatures d'un même nombre de pièces ne dépendent que
+    des tables plus petites : elles sont calculées en parallèle sur `workers` processus (1 : dans le processus
+    courant), un nombre de pièces après l'autre.
+
+    Args:
+        max_pieces (int): Nombre maximal de pièces sur le plateau.
+        directory (str): Dossier où écrire les tables.
+        workers (int, optional): Nombre de processus (par défaut, le nombre de cœurs).
+        progress (callable, optional): Appelé avec les statistiques de chaque table calculée.
+
+    Returns:
+        list of dict: Les statistiques de chaque table.
+    """
+    stats = []
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+        for n_pieces in range(2, max_pieces + 1):
+            tasks = [(signature, directory) for signature in signatures(max_pieces) if len(signature) == n_pieces]
+            outcomes = pool.imap_unordered(_generate_table, tasks) if pool is not None else map(_generate_table, tasks)
+            for table_stats in outcomes:
+                stats.append(table_stats)
+                if progress is not None:
+                    progress(table_stats)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Calcule les tables de finales de Fenix.")
+    parser.add_argument('--pieces', type=int, default=3, help="nombre maximal de pièces")
+    parser.add_argument('--workers', type=int, default=None, help="processus (par défaut : nombre de cœurs)")
+    parser.add_argument('--output', default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    print(f"{'table':>8} {'positions':>10} {'gains':>9} {'nulles':>9} {'pertes':>9} {'DTM max':>8} {'durée (s)':>10}")
+    generate(args.pieces, args.output, args.workers, progress=lambda s: print(
+        f"{s['signature']:>8} {s['positions']:>10} {s['wins']:>9} {s['draws']:>9} {s['losses']:>9} "
+        f"{s['max_dtm']:>8} {s['time']:>10.1f}"))
@@ -0,0 +1,135 @@
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from evaluation import DEFAULT_WEIGHTS, DEFAULT_WEIGHTS_PATH, EVALUATION_WEIGHTS, WEIGHT_NAMES, features, save_weights
+from self_play import DEFAULT_PATH, load_records
+
+_features = None
+_targets = None
+
+
+def training_set(records):
+    """
+    Positions d'entraînement tirées d'enregistrements de self_play : positions après la phase de placement où le
+    coup joué ne prend rien (les prises étant obligatoires, la position est calme et son évaluation statique est
+    fiable). Renvoie la matrice des termes de l'évaluation (N, 7), du point de vue du joueur au trait, et le
+    résultat de la partie pour ce joueur ramené entre 0 et 1.
+    """
+    quiet = (records['turn'] >= 10) & (records['move_removed'] == 0)
+    selected = records[quiet]
+    targets = (selected['result'].astype(np.float64) + 1) / 2
+    return features(selected['board'], selected['player']), targets
+
+
+def _loss_and_gradient(terms, targets, weights, k):
+    # Somme des erreurs quadratiques entre le résultat et la probabilité de gain sigmoid(k * évaluation), et
+    # son gradient par rapport aux poids.
+    predictions = 1 / (1 + np.exp(-k * (terms @ weights)))
+    errors = predictions - targets
+    gradient = terms.T @ (2 * errors * predictions * (1 - predictions) * k)
+    return float(errors @ errors), gradient
+
+
+def _init_worker(terms, targets):
+    global _features, _targets
+    _features, _targets = terms, targets
+
+
+def _chunk_loss_and_gradient(task):
+    # Tâche d'un processus : erreur et gradient sur une tranche des positions.
+    start, stop, weights, k = task
+    return _loss_and_gradient(_features[start:stop], _targets[start:stop], weights, k)
+
+
+def fit_scale(terms, targets, weights):
+    """
+    Cherche le facteur k de la sigmoïde qui relie l'évaluation au résultat pour les poids donnés (recherche en
+    grille logarithmique, puis affinée autour du meilleur point).
+    """
+    def loss(k):
+        return _loss_and_gradient(terms, targets, weights, k)[0]
+
+    best = min(np.logspace(-3, 1, 41), key=loss)
+    return float(min(np.linspace(best / 1.3, best * 1.3, 21), key=loss))
+
+
+def tune(terms, targets, weights=DEFAULT_WEIGHTS, iterations=500, learning_rate=0.01, workers=1, progress=None):
+    """
+    Ajuste les poids de l'évaluation (EVALUATION_WEIGHTS) pour que sigmoid(k * évaluation) prédise le résultat des
+    parties (méthode de Texel), par descente de gradient Adam sur l'erreur quadratique moyenne. Toutes les positions
+    sont évaluées en un seul produit matriciel par itération ; avec `workers` > 1, les positions sont réparties en
+    tranches sur un pool de processus qui calculent chacun l'erreur et le gradient de leur tranche. k est fixé au
+    départ par `fit_scale`. Les poids de `heuristique` ne dépendent pas du résultat des parties et sont gardés.
+
+    Args:
+        progress (callable, optional): Appelé toutes les 50 itérations avec (itération, erreur moyenne).
+
+    Returns:
+        tuple: (vecteur de poids complet, k, erreur moyenne finale).
+    """
+    size = len(EVALUATION_WEIGHTS)
+    weights = np.asarray(weights, dtype=np.float64).copy()
+    evaluation = weights[:size].copy()
+    k = fit_scale(terms, targets, evaluation)
+    n = len(targets)
+
+    pool = None
+    if workers != 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(terms, targets))
+        bounds = np.linspace(0, n, (workers or multiprocessing.cpu_count()) + 1).astype(int)
+
+    def loss_and_gradient(current):
+        if pool is None:
+            return _loss_and_gradient(terms, targets, current, k)
+        parts = pool.map(_chunk_loss_and_gradient, [(start, stop, current, k)
+                                                    for start, stop in zip(bounds[:-1], bounds[1:])])
+        return sum(loss for loss, _ in parts), sum(gradient for _, gradient in parts)
+
+    moment, second = np.zeros(size), np.zeros(size)
+    beta1, beta2 = 0.9, 0.999
+    try:
+        for iteration in range(1, iterations + 1):
+            loss, gradient = loss_and_gradient(evaluation)
+            gradient /= n
+            moment = beta1 * moment + (1 - beta1) * gradient
+            second = beta2 * second + (1 - beta2) * gradient ** 2
+            step = moment / (1 - beta1 ** iteration) / (np.sqrt(second / (1 - beta2 ** iteration)) + 1e-12)
+            evaluation -= learning_rate * step
+            if progress is not None and iteration % 50 == 0:
+                progress(iteration, loss / n)
+        loss, _ = loss_and_gradient(evaluation)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    weights[:size] = evaluation
+    return weights, k, loss / n
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ajuste les poids de l'évaluation sur des parties de self_play.py.")
+    parser.add_argument('--input', default=DEFAULT_PATH, help="fichier d'enregistrements de self_play.py")
+    parser.add_argument('--output', default=DEFAULT_WEIGHTS_PATH, help="fichier de poids chargé par BaseAgent")
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--learning-rate', type=float, default=0.01)
+    parser.add_argument('--workers', type=int, default=1, help="processus du calcul du gradient")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    terms, targets = training_set(load_records(args.input))
+    print(f"{len(targets)} positions calmes")
+    initial = _loss_and_gradient(terms, targets, DEFAULT_WEIGHTS[:len(EVALUATION_WEIGHTS)],
+                                 fit_scale(terms, targets, DEFAULT_WEIGHTS[:len(EVALUATION_WEIGHTS)]))[0]
+    print(f"erreur des poids d'origine : {initial / len(targets):.5f}")
+    weights, k, loss = tune(terms, targets, iterations=args.iterations, learning_rate=args.learning_rate,
+                            workers=args.workers,
+                            progress=lambda iteration, loss: print(f"itération {iteration} : erreur {loss:.5f}"))
+    save_weights(weights, args.output)
+    print(f"k = {k:.4f}, erreur finale {loss:.5f} ({time.perf_counter() - start:.1f} s)")
+    for name, weight in zip(WEIGHT_NAMES, weights):
+        print(f"{name:<16} {weight:>8.3f}")
+    print(f"poids écrits dans {args.output}")
@@ -0,0 +1,244 @@
+import argparse
+import itertools
+import math
+import multiprocessing
+import random
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from game_manager import TextGameManager
+
+AgentSpec = namedtuple('AgentSpec', ['name', 'agent_class', 'kwargs'])
+"""
+AgentSpec describes how to build a tournament participant in a worker process.
+
+Attributes:
+    name (str): The name of the participant in the results table.
+    agent_class (type): The `Agent` subclass, called as `agent_class(player, **kwargs)`.
+    kwargs (dict): Extra keyword arguments given to the constructor.
+"""
+
+GameResult = namedtuple('GameResult', ['red', 'black', 'seed', 'score', 'red_time', 'black_time',
+                                       'red_timeout', 'black_timeout', 'error'])
+"""
+GameResult holds the outcome of one tournament game.
+
+Attributes:
+    red (str): The name of the agent playing player 1.
+    black (str): The name of the agent playing player -1.
+    seed (int): The seed of the random number generators for this game.
+    score (int): The utility for player 1 (1 win, 0 draw, -1 loss).
+    red_time (float): The clock time used by player 1, in seconds.
+    black_time (float): The clock time used by player -1, in seconds.
+    red_timeout (bool): Whether player 1 ran out of time.
+    black_timeout (bool): Whether player -1 ran out of time.
+    error (str or None): The exception raised during the game, if any (the game is then not scored).
+"""
+
+
+def play_game(red, black, seed, time_limit):
+    """
+    Plays one headless game between two agents.
+
+    Args:
+        red (AgentSpec): The agent playing player 1.
+        black (AgentSpec): The agent playing player -1.
+        seed (int): The seed of the `random` and NumPy random number generators.
+        time_limit (float): The clock time of each player, in seconds.
+
+    Returns:
+        GameResult: The outcome of the game.
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    agents = [red.agent_class(1, **red.kwargs), black.agent_class(-1, **black.kwargs)]
+    manager = TextGameManager(agents[0], agents[1], time_limit=time_limit, display=False)
+    try:
+        score, _ = manager.play()
+        error = None
+    except Exception as exception:
+        score, error = 0, repr(exception)
+    finally:
+        for agent in agents:
+            if hasattr(agent, 'close'):
+                agent.close()
+    return GameResult(red.name, black.name, seed, score,
+                      time_limit - manager.remaining_time_1, time_limit - manager.remaining_time_2,
+                      manager.remaining_time_1 < 0, manager.remaining_time_2 < 0, error)
+
+
+def _play_game(task):
+    return play_game(*task)
+
+
+def schedule(specs, games_per_pair, seed=0):
+    """
+    Builds the round-robin schedule: every pair of agents plays `games_per_pair` games, with colours swapped
+    between consecutive games so that both agents play the same number of games as player 1.
+
+    Returns:
+        list of tuple: The (red, black, seed) of each game.
+    """
+    games = []
+    for first, second in itertools.combinations(specs, 2):
+        for game in range(games_per_pair):
+            red, black = (first, second) if game % 2 == 0 else (second, first)
+            games.append((red, black, seed + len(games)))
+    return games
+
+
+def run_tournament(specs, games_per_pair=100, time_limit=60, workers=None, seed=0, progress=None):
+    """
+    Plays a round-robin tournament between agents in parallel worker processes.
+
+    Agents that start their own process pool (such as `ParallelBaseAgent`) cannot run inside pool workers: use
+    `workers=1` to play the games one after the other in the current process.
+
+    Args:
+        specs (list of AgentSpec): The participants.
+        games_per_pair (int): The number of games played by each pair of agents.
+        time_limit (float): The clock time of each player, in seconds.
+        workers (int, optional): The number of worker processes (default: the number of cores).
+        seed (int): The seed of the first game; game i uses seed + i.
+        progress (callable, optional): Called with each GameResult as soon as it is available.
+
+    Returns:
+        list of GameResult: The results of all games.
+    """
+    tasks = [(red, black, game_seed, time_limit) for red, black, game_seed in schedule(specs, games_per_pair, seed)]
+    results = []
+    if workers == 1:
+        outcomes = map(_play_game, tasks)
+    else:
+        pool = multiprocessing.Pool(workers)
+        outcomes = pool.imap_unordered(_play_game, tasks)
+    try:
+        for result in outcomes:
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    finally:
+        if workers != 1:
+            pool.close()
+            pool.join()
+    return results
+
+
+def elo_difference(score):
+    """
+    Converts an expected score (between 0 and 1) to an Elo rating difference.
+    """
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1) + 0.0
+
+
+def score_interval(points, z=1.96):
+    """
+    Computes the mean score of a list of game points (1 win, 0.5 draw, 0 loss) and the Elo difference with its
+    Wilson score confidence interval, which keeps a non-zero width when every game was won or lost.
+
+    Returns:
+        tuple: (mean score, Elo difference, lower Elo bound, upper Elo bound).
+    """
+    n = len(points)
+    mean = sum(points) / n
+    denominator = 1 + z * z / n
+    center = (mean + z * z / (2 * n)) / denominator
+    margin = z * math.sqrt(mean * (1 - mean) / n + z * z / (4 * n * n)) / denominator
+    return mean, elo_difference(mean), elo_difference(center - margin), elo_difference(center + margin)
+
+
+def summarize(results):
+    """
+    Aggregates game results per agent and per pair of agents.
+
+    Returns:
+        tuple: (agents, pairs) where `agents` maps a name to its statistics against the whole field (games, wins,
+        draws, losses, errors, timeouts, average clock time used per game, score, Elo and confidence interval) and
+        `pairs` maps (name, opponent) to the same statistics restricted to that pairing.
+    """
+    points = dict()
+    records = dict()
+
+    def record(name, opponent, result, point, used, timeout):
+        for key in (name, (name, opponent)):
+            stats = records.setdefault(key, {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'errors': 0,
+                                             'timeouts': 0, 'time': 0.0})
+            if result.error is not None:
+                stats['errors'] += 1
+                continue
+            stats['games'] += 1
+            stats['wins'] += point == 1
+            stats['draws'] += point == 0.5
+            stats['losses'] += point == 0
+            stats['timeouts'] += timeout
+            stats['time'] += used
+            points.setdefault(key, []).append(point)
+
+    for result in results:
+        red_point = (result.score + 1) / 2
+        record(result.red, result.black, result, red_point, result.red_time, result.red_timeout)
+        record(result.black, result.red, result, 1 - red_point, result.black_time, result.black_timeout)
+
+    for key, stats in records.items():
+        stats['time'] = stats['time'] / stats['games'] if stats['games'] else 0.0
+        if key in points:
+            stats['score'], stats['elo'], stats['elo_low'], stats['elo_high'] = score_interval(points[key])
+        else:
+            stats['score'] = stats['elo'] = stats['elo_low'] = stats['elo_high'] = float('nan')
+
+    agents = {key: stats for key, stats in records.items() if isinstance(key, str)}
+    pairs = {key: stats for key, stats in records.items() if isinstance(key, tuple)}
+    return agents, pairs
+
+
+def format_table(results):
+    """
+    Formats the tournament results as text tables: one line per agent (against the field), then one line per
+    pairing. Elo values are relative to the opponents, with a 95% confidence interval.
+    """
+    agents, pairs = summarize(results)
+    header = f"{'agent':<44} {'games':>5} {'W':>5} {'D':>5} {'L':>5} {'score':>6} {'elo':>7} {'95% CI':>17} {'time/game':>9} {'t/o':>4} {'err':>4}"
+    lines = [header, '-' * len(header)]
+
+    def line(name, stats):
+        return (f"{name:<44} {stats['games']:>5} {stats['wins']:>5} {stats['draws']:>5} {stats['losses']:>5} "
+                f"{stats['score']:>6.3f} {stats['elo']:>7.0f} [{stats['elo_low']:>6.0f}, {stats['elo_high']:>6.0f}] "
+                f"{stats['time']:>9.2f} {stats['timeouts']:>4} {stats['errors']:>4}")
+
+    for name, stats in sorted(agents.items(), key=lambda item: -item[1]['score']):
+        lines.append(line(name, stats))
+    lines.append('')
+    lines.append(header.replace('agent   ', 'pairing ', 1))
+    lines.append('-' * len(header))
+    for (name, opponent), stats in sorted(pairs.items()):
+        lines.append(line(f"{name} vs {opponent}", stats))
+    return '\n'.join(lines)
+
+
+def default_specs():
+    """
+    Default participants: BaseAgent at fixed depths 1 to 3 and RandomAgent.
+    """
+    from agent import BaseAgent
+    from random_agent import RandomAgent
+
+    specs = [AgentSpec(f"BaseAgent(depth={depth})", BaseAgent, {'search_depth': depth}) for depth in (1, 2, 3)]
+    specs.append(AgentSpec("RandomAgent", RandomAgent, {}))
+    return specs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Headless Fenix tournament between the default agents.")
+    parser.add_argument('--games', type=int, default=20, help="games per pair of agents")
+    parser.add_argument('--time', type=float, default=60, help="clock time per player, in seconds")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: number of cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_tournament(default_specs(), args.games, args.time, args.workers, args.seed)
+    print(format_table(results))
+    print(f"\n{len(results)} games in {time.perf_counter() - start:.1f} s")
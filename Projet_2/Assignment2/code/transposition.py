@@ -0,0 +1,112 @@
+from collections import namedtuple
+import random
+
+EXACT, LOWER, UPPER = 0, 1, 2
+"""Type de borne d'une valeur stockée : exacte, borne inférieure (coupure bêta) ou supérieure (échec en alpha)."""
+
+TTEntry = namedtuple('TTEntry', ['key', 'depth', 'value', 'bound', 'move', 'generation'])
+"""
+Entrée de la table de transposition.
+
+Attributes:
+    key (int): Clé complète de la position (voir `position_key`), pour détecter les collisions d'index.
+    depth (int): Profondeur restante de la recherche qui a produit la valeur.
+    value (float): Valeur de la position, du point de vue de l'agent.
+    bound (int): EXACT, LOWER ou UPPER.
+    move (FenixAction or None): Meilleur coup trouvé dans la position.
+    generation (int): Numéro de la recherche qui a écrit l'entrée.
+"""
+
+_key_random = random.Random(0x7AB1E)
+_SETUP_KEY = _key_random.getrandbits(64)
+_CREATE_GENERAL_KEY = _key_random.getrandbits(64)
+_CREATE_KING_KEY = _key_random.getrandbits(64)
+
+
+def position_key(state):
+    """
+    Clé stable (64 bits) d'une position : hash de Zobrist du plateau et du joueur à jouer, complété par la phase
+    de placement et les drapeaux de création, qui changent les coups légaux.
+    """
+    key = state._hash()
+    if state.turn < 10:
+        key ^= _SETUP_KEY
+    if state.can_create_general:
+        key ^= _CREATE_GENERAL_KEY
+    if state.can_create_king:
+        key ^= _CREATE_KING_KEY
+    return key
+
+
+class TranspositionTable:
+    """
+    Table de transposition de taille bornée.
+
+    Chaque case de la table contient deux entrées : la première est remplacée seulement par une recherche
+    au moins aussi profonde ou plus récente (« depth-preferred »), la seconde est toujours remplacée
+    (« always-replace »). Le nombre de cases est déduit de la mémoire allouée en Mo.
+
+    Attributes:
+        size (int): Nombre de cases.
+        generation (int): Numéro de la recherche en cours, incrémenté par `new_search`.
+        hits (int): Nombre de sondages ayant trouvé la position.
+        misses (int): Nombre de sondages n'ayant pas trouvé la position.
+        cutoffs (int): Nombre de sondages dont la valeur a suffi à couper la recherche (mis à jour par l'agent).
+        stores (int): Nombre d'entrées écrites.
+    """
+    ENTRY_BYTES = 160
+    """Taille estimée d'une entrée en mémoire (tuple, clé, valeur et emplacement dans la liste)."""
+
+    def __init__(self, size_mb=16):
+        self.size = max(1, int(size_mb * 2**20) // (2 * self.ENTRY_BYTES))
+        self.generation = 0
+        self.clear()
+
+    def clear(self):
+        """Vide la table et remet les compteurs à zéro."""
+        self.deep = [None] * self.size
+        self.recent = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.cutoffs = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Signale le début d'une nouvelle recherche : les entrées plus anciennes deviennent remplaçables."""
+        self.generation += 1
+
+    def probe(self, key):
+        """Renvoie l'entrée associée à la clé, ou None si la position n'est pas dans la table."""
+        index = key % self.size
+        entry = self.deep[index]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        entry = self.recent[index]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, bound, move):
+        """Enregistre le résultat d'une recherche selon la politique de remplacement."""
+        index = key % self.size
+        entry = TTEntry(key, depth, value, bound, move, self.generation)
+        deep = self.deep[index]
+        if deep is None or deep.key == key or depth >= deep.depth or deep.generation != self.generation:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+        self.stores += 1
+
+    def stats(self):
+        """Renvoie les compteurs de la table sous forme de dictionnaire."""
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'cutoffs': self.cutoffs,
+            'stores': self.stores,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
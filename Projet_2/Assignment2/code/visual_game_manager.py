@@ -32,7 +32,7 @@ class VisualGameManager:
         play(): Runs the main game loop until the user quits. This method should be called to start the game.
     """
 
-    def __init__(self, red_agent=None, black_agent=None, total_time=300 , min_agent_play_time=0.5):
+    def __init__(self, red_agent=None, black_agent=None, total_time=300 , min_agent_play_time=0.5, ponder=False):
         """
         Initializes the game manager and sets up the graphical interface.
 
@@ -41,9 +41,11 @@ class VisualGameManager:
             black_agent (object, optional): AI agent for the black player (None for human control).
             total_time (int, optional): Total time per player in seconds (default: 300).
             min_agent_play_time (float, optional): Minimum agent thinking time (default: 0.5s).
+            ponder (bool, optional): Let the agents search during their opponent's time (default: False).
         """
         self.dim = (7, 8)
         self.min_agent_play_time = min_agent_play_time
+        self.ponder = ponder
 
         self.red_agent = red_agent
         self.black_agent = black_agent
@@ -122,6 +124,8 @@ class VisualGameManager:
             raise ValueError("Human to play")
         agent = self.red_agent if self.state.current_player == 1 else self.black_agent
         remaining_time = self.remaining_time_red if self.state.current_player == 1 else self.remaining_time_black
+        if self.ponder:
+            agent.stop_pondering()
         self.agent_action = agent.act(deepcopy(self.state), remaining_time)
 
     def update(self):
@@ -152,8 +156,18 @@ class VisualGameManager:
                 if self.selected_action not in self.actions:
                     raise ValueError("Invalid action")
 
+                mover = self.red_agent if self.state.to_move() == 1 else self.black_agent
                 self.state = self.state.result(self.selected_action)
                 self.actions = self.state.actions()
+
+                # Copying the state and starting the background search are charged to the agent that moved.
+                if self.ponder and mover is not None and not self.state.is_terminal():
+                    ponder_start = time.perf_counter_ns()
+                    mover.ponder(deepcopy(self.state))
+                    if mover is self.red_agent:
+                        self.remaining_time_red -= (time.perf_counter_ns() - ponder_start) * 1e-9
+                    else:
+                        self.remaining_time_black -= (time.perf_counter_ns() - ponder_start) * 1e-9
                 self.selected_actions = []
                 self.selected_id = 0
                 self.selected_action = None